@@ -0,0 +1,368 @@
+# b_tree.py
+
+from bisect import bisect_left, bisect_right
+from collections.abc import MutableMapping
+import typing
+
+HashableItems = typing.Iterable[
+    typing.Tuple[typing.Hashable, typing.Any]
+]
+
+
+class BTree(MutableMapping):
+    """Implement a B+ tree as a sorted map.
+    The keys must have a total ordering (i.e. any two keys can be compared).
+    Every node holds up to `fanout` sorted keys (or children), which are searched
+    with bisect. The items are only stored in the leaves, and the leaves are linked
+    in both directions so that ordered iteration and range scans never go back up
+    the tree.
+    Compared with BinarySearchTree, there are far fewer node objects and the tree
+    is only about log(n) / log(fanout) levels deep.
+    """
+
+    def __init__(self, items: typing.Optional[HashableItems] = None, fanout=32):
+        """
+        :argument:
+        items (iterable of tuples): an iterable of (key, value) pairs
+        fanout (int): the maximum number of keys in a leaf, and the maximum
+            number of children of an internal node, must be at least 3
+        """
+        if fanout < 3:
+            raise ValueError('fanout must be at least 3')
+
+        self._fanout = fanout
+        self._root = _LeafNode()
+        self._len = 0
+
+        if items is not None:
+            for key, value in items:
+                self[key] = value
+
+    def __len__(self):
+        """Return the number of items."""
+        return self._len
+
+    def __iter__(self):
+        """Iterate over the keys in ascending order."""
+        leaf = self._root.first_leaf()
+        while leaf is not None:
+            yield from leaf.keys
+            leaf = leaf.next
+
+    """Helper methods"""
+
+    def _find_leaf(self, key):
+        """Return the leaf in which the key is (or would be) stored,
+        together with the path of (internal node, child index) pairs leading to it.
+        """
+        path = []
+        node = self._root
+        while isinstance(node, _InternalNode):
+            idx = bisect_right(node.keys, key)
+            path.append((node, idx))
+            node = node.children[idx]
+        return node, path
+
+    """Ordering methods"""
+
+    def minimum(self):
+        """Return the (key, value) pair with the minimum key.
+        Raise a KeyError if the tree is empty.
+        """
+        if self._len == 0:
+            raise KeyError('empty tree')
+        else:
+            leaf = self._root.first_leaf()
+            return leaf.keys[0], leaf.values[0]
+
+    def maximum(self):
+        """Return the (key, value) pair with the maximum key.
+        Raise a KeyError if the tree is empty.
+        """
+        if self._len == 0:
+            raise KeyError('empty tree')
+        else:
+            leaf = self._root.last_leaf()
+            return leaf.keys[-1], leaf.values[-1]
+
+    def predecessor(self, key):
+        """Return the (key, value) pair with the largest key that is strictly
+        less than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly less than the given key.
+        """
+        if self._len == 0:
+            raise KeyError('empty tree')
+
+        leaf, _ = self._find_leaf(key)
+        idx = bisect_left(leaf.keys, key)
+        if idx > 0:
+            return leaf.keys[idx - 1], leaf.values[idx - 1]
+
+        # every key in this leaf is at least the given key,
+        # so the predecessor is the last key of the previous leaf
+        elif leaf.prev is None:
+            raise KeyError(f'No key less than {key}')
+        else:
+            return leaf.prev.keys[-1], leaf.prev.values[-1]
+
+    def successor(self, key):
+        """Return the (key, value) pair with the smallest key that is strictly
+        greater than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly greater than the given key.
+        """
+        if self._len == 0:
+            raise KeyError('empty tree')
+
+        # the logic is similar to finding the predecessor
+        leaf, _ = self._find_leaf(key)
+        idx = bisect_right(leaf.keys, key)
+        if idx < len(leaf.keys):
+            return leaf.keys[idx], leaf.values[idx]
+        elif leaf.next is None:
+            raise KeyError(f'No key greater than {key}')
+        else:
+            return leaf.next.keys[0], leaf.next.values[0]
+
+    def items_between(self, low, high):
+        """Iterate over the (key, value) pairs with low <= key <= high
+        in ascending order of keys.
+        """
+        leaf, _ = self._find_leaf(low)
+        idx = bisect_left(leaf.keys, low)
+
+        # walk along the linked leaves until passing the upper bound
+        while leaf is not None:
+            keys, values = leaf.keys, leaf.values
+            for i in range(idx, len(keys)):
+                if keys[i] > high:
+                    return
+                yield keys[i], values[i]
+            leaf = leaf.next
+            idx = 0
+
+    """Accessor methods"""
+
+    def __getitem__(self, key):
+        """Get the value corresponding to the key.
+        Raise a KeyError if no such key found.
+        """
+        leaf, _ = self._find_leaf(key)
+        idx = bisect_left(leaf.keys, key)
+        if idx < len(leaf.keys) and leaf.keys[idx] == key:
+            return leaf.values[idx]
+        else:
+            raise KeyError(f'key {key} not found')
+
+    def __setitem__(self, key, value):
+        """Set self[key] to be value.
+        Overwrite the old value if key found.
+        """
+        leaf, path = self._find_leaf(key)
+        idx = bisect_left(leaf.keys, key)
+        if idx < len(leaf.keys) and leaf.keys[idx] == key:
+            leaf.values[idx] = value
+            return
+
+        leaf.keys.insert(idx, key)
+        leaf.values.insert(idx, value)
+        self._len += 1
+
+        # split the overflowing nodes from the leaf upwards
+        node = leaf
+        while node.is_overfull(self._fanout):
+            sep_key, new_node = node.split()
+            if not path:
+                # the root itself is split, grow the tree by one level
+                self._root = _InternalNode([sep_key], [node, new_node])
+                return
+
+            parent, idx = path.pop()
+            parent.keys.insert(idx, sep_key)
+            parent.children.insert(idx + 1, new_node)
+            node = parent
+
+    def __delitem__(self, key):
+        """Delete self[key].
+        Raise a KeyError if no such key found.
+        """
+        leaf, path = self._find_leaf(key)
+        idx = bisect_left(leaf.keys, key)
+        if idx == len(leaf.keys) or leaf.keys[idx] != key:
+            raise KeyError(f'key {key} not found')
+
+        del leaf.keys[idx]
+        del leaf.values[idx]
+        self._len -= 1
+
+        # fix the underflowing nodes from the leaf upwards
+        node = leaf
+        while path and node.is_underfull(self._fanout):
+            parent, idx = path.pop()
+            parent.rebalance(idx, self._fanout)
+            node = parent
+
+        # if the root has only one child left, shrink the tree by one level
+        if isinstance(self._root, _InternalNode) and len(self._root.children) == 1:
+            self._root = self._root.children[0]
+
+
+class _LeafNode:
+    """Represent a leaf of the B+ tree, which stores the sorted keys and
+    their values in two parallel lists.
+    The leaves are doubly linked in ascending order of keys.
+    """
+    __slots__ = 'keys', 'values', 'prev', 'next'
+
+    def __init__(self, keys=None, values=None):
+        self.keys = [] if keys is None else keys
+        self.values = [] if values is None else values
+        self.prev = None
+        self.next = None
+
+    def first_leaf(self):
+        return self
+
+    def last_leaf(self):
+        return self
+
+    def is_overfull(self, fanout):
+        return len(self.keys) > fanout
+
+    def is_underfull(self, fanout):
+        return len(self.keys) < fanout // 2
+
+    def can_lend(self, fanout):
+        return len(self.keys) > fanout // 2
+
+    def split(self):
+        """Move the upper half of the items to a new leaf linked right after self.
+        Return the separating key (the smallest key of the new leaf) and the new leaf.
+        """
+        mid = len(self.keys) // 2
+        new_leaf = _LeafNode(self.keys[mid:], self.values[mid:])
+        del self.keys[mid:]
+        del self.values[mid:]
+
+        new_leaf.prev = self
+        new_leaf.next = self.next
+        if self.next is not None:
+            self.next.prev = new_leaf
+        self.next = new_leaf
+        return new_leaf.keys[0], new_leaf
+
+    def merge(self, right, sep_key):
+        """Absorb all items of the right sibling, which is then unlinked."""
+        self.keys.extend(right.keys)
+        self.values.extend(right.values)
+        self.next = right.next
+        if right.next is not None:
+            right.next.prev = self
+
+    def borrow_left(self, left, sep_key):
+        """Move the last item of the left sibling to self.
+        Return the new separating key between the two.
+        """
+        self.keys.insert(0, left.keys.pop())
+        self.values.insert(0, left.values.pop())
+        return self.keys[0]
+
+    def borrow_right(self, right, sep_key):
+        """Move the first item of the right sibling to self.
+        Return the new separating key between the two.
+        """
+        self.keys.append(right.keys.pop(0))
+        self.values.append(right.values.pop(0))
+        return right.keys[0]
+
+
+class _InternalNode:
+    """Represent an internal node of the B+ tree.
+    All keys in children[i] lie in the range [keys[i - 1], keys[i]).
+    """
+    __slots__ = 'keys', 'children'
+
+    def __init__(self, keys, children):
+        self.keys = keys
+        self.children = children
+
+    def first_leaf(self):
+        node = self
+        while isinstance(node, _InternalNode):
+            node = node.children[0]
+        return node
+
+    def last_leaf(self):
+        node = self
+        while isinstance(node, _InternalNode):
+            node = node.children[-1]
+        return node
+
+    def is_overfull(self, fanout):
+        return len(self.children) > fanout
+
+    def is_underfull(self, fanout):
+        return len(self.children) < (fanout + 1) // 2
+
+    def can_lend(self, fanout):
+        return len(self.children) > (fanout + 1) // 2
+
+    def split(self):
+        """Move the upper half of the children to a new node.
+        Return the separating key, which moves up to the parent, and the new node.
+        """
+        mid = len(self.children) // 2
+        sep_key = self.keys[mid - 1]
+        new_node = _InternalNode(self.keys[mid:], self.children[mid:])
+        del self.keys[mid - 1:]
+        del self.children[mid:]
+        return sep_key, new_node
+
+    def merge(self, right, sep_key):
+        """Absorb all children of the right sibling.
+        The separating key is pulled down from the parent.
+        """
+        self.keys.append(sep_key)
+        self.keys.extend(right.keys)
+        self.children.extend(right.children)
+
+    def borrow_left(self, left, sep_key):
+        """Rotate the last child of the left sibling to self through the parent.
+        Return the new separating key between the two.
+        """
+        self.keys.insert(0, sep_key)
+        self.children.insert(0, left.children.pop())
+        return left.keys.pop()
+
+    def borrow_right(self, right, sep_key):
+        """Rotate the first child of the right sibling to self through the parent.
+        Return the new separating key between the two.
+        """
+        self.keys.append(sep_key)
+        self.children.append(right.children.pop(0))
+        return right.keys.pop(0)
+
+    def rebalance(self, idx, fanout):
+        """Fix the underflowing child at the given index, either by borrowing
+        from a sibling that has some to spare, or by merging with a sibling.
+        """
+        child = self.children[idx]
+
+        # prefer the left sibling, fall back to the right one for the first child
+        if idx > 0:
+            left = self.children[idx - 1]
+            if left.can_lend(fanout):
+                self.keys[idx - 1] = child.borrow_left(left, self.keys[idx - 1])
+                return
+            else:
+                idx -= 1
+                child, right = left, child
+        else:
+            right = self.children[1]
+            if right.can_lend(fanout):
+                self.keys[0] = child.borrow_right(right, self.keys[0])
+                return
+
+        # merge the right node of the pair into the left one
+        child.merge(right, self.keys[idx])
+        del self.keys[idx]
+        del self.children[idx + 1]
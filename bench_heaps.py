@@ -0,0 +1,97 @@
+# bench_heaps.py
+
+"""Benchmarks for the priority queues. Run this module as a script."""
+
+import random
+import time
+
+from heap_queue import HeapQueue, LazyHeapQueue, IndexedHeapQueue
+from pairing_heap import PairingHeap
+from radix_heap import RadixHeap
+from weighted_graph import DirectedGraph
+
+
+def random_graph(node_count, degree, max_weight=100):
+    """Return a random directed graph, in which every node has the given out-degree."""
+    g = DirectedGraph()
+    for node in range(node_count):
+        g.add_node(node)
+        for nbr in random.sample(range(node_count), degree):
+            g.add_edge(node, nbr, random.randint(1, max_weight))
+    return g
+
+
+def grid_graph(side, max_weight=100):
+    """Return a road-like square grid, with edges in both directions between neighbors."""
+    g = DirectedGraph()
+    for x in range(side):
+        for y in range(side):
+            for nbr in [(x + 1, y), (x, y + 1)]:
+                if nbr[0] < side and nbr[1] < side:
+                    g.add_edge((x, y), nbr, random.randint(1, max_weight))
+                    g.add_edge(nbr, (x, y), random.randint(1, max_weight))
+    return g
+
+
+def dijkstra(g, start, heap_factory):
+    """Run a full single-source Dijkstra over g with the queue made by heap_factory,
+    in the same way as DirectedGraph does, and return the settled costs.
+    """
+    costs = {}
+    frontier = heap_factory([(start, 0)])
+
+    while frontier:
+        cur_node, cur_cost = frontier.pop()
+        costs[cur_node] = cur_cost
+        for nxt_node, weight in g.neighbors(cur_node):
+            if nxt_node not in costs:
+                nxt_cost = cur_cost + weight
+                if nxt_node not in frontier or nxt_cost < frontier[nxt_node]:
+                    frontier.push(nxt_node, nxt_cost)
+    return costs
+
+
+def time_dijkstra(g, starts, heap_factory):
+    """Return the seconds taken to run Dijkstra from every start node."""
+    begin = time.perf_counter()
+    for start in starts:
+        dijkstra(g, start, heap_factory)
+    return time.perf_counter() - begin
+
+
+def bench_arity(graphs, arities=(2, 3, 4, 8, 16), runs=3):
+    """Compare the Dijkstra running time of HeapQueue with different arities."""
+    for name, g in graphs:
+        starts = random.sample(list(g.nodes), runs)
+        print(f'{name}: {g.node_count} nodes, {g.edge_count} edges')
+        for arity in arities:
+            seconds = time_dijkstra(g, starts, lambda entries: HeapQueue(entries, arity))
+            print(f'{"arity " + str(arity):>20}: {seconds:.3f}s')
+
+
+def bench_heap_types(graphs, heap_types, runs=3):
+    """Compare the Dijkstra running time of different priority queues."""
+    for name, g in graphs:
+        starts = random.sample(list(g.nodes), runs)
+        print(f'{name}: {g.node_count} nodes, {g.edge_count} edges')
+        for heap_name, heap_factory in heap_types:
+            seconds = time_dijkstra(g, starts, heap_factory)
+            print(f'{heap_name:>20}: {seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    graphs = [('sparse random graph', random_graph(50_000, 4)),
+              ('dense random graph', random_graph(5_000, 64)),
+              ('grid graph', grid_graph(200))]
+    bench_arity(graphs)
+    bench_heap_types(graphs, [('HeapQueue', lambda entries: HeapQueue(entries, 8)),
+                              ('HeapQueue array',
+                               lambda entries: HeapQueue(entries, 8, typecode='d')),
+                              ('LazyHeapQueue', LazyHeapQueue),
+                              ('PairingHeap', PairingHeap),
+                              ('RadixHeap', RadixHeap)])
+
+    # IndexedHeapQueue needs the nodes relabelled as 0, 1, ..., n - 1
+    int_graphs = [(name, g) for name, g in graphs if name != 'grid graph']
+    bench_heap_types(int_graphs, [('IndexedHeapQueue',
+                                   lambda entries: IndexedHeapQueue(50_000, entries, 8))])
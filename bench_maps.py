@@ -0,0 +1,47 @@
+# bench_maps.py
+
+"""Benchmarks for the sorted maps. Run this module as a script."""
+
+import random
+import time
+
+from binary_search_tree import BinarySearchTree, SplayTree
+
+
+def zipf_keys(keys, count, exponent=1.1):
+    """Draw count keys from the given list, in which the i-th key is chosen
+    with probability proportional to 1 / (i + 1) ** exponent.
+    """
+    hot_keys = random.sample(keys, len(keys))
+    weights = [1 / (rank + 1) ** exponent for rank in range(len(hot_keys))]
+    return random.choices(hot_keys, weights, k=count)
+
+
+def time_lookups(my_map, lookups):
+    """Return the seconds taken to look up all the keys."""
+    start = time.perf_counter()
+    for key in lookups:
+        my_map[key]
+    return time.perf_counter() - start
+
+
+def bench_skewed_lookups(size=100_000, count=500_000, exponent=1.1):
+    """Compare the lookup time of the plain and the splay tree under a
+    Zipf-distributed workload, in which a few hot keys get most of the reads.
+    """
+    keys = list(range(size))
+    random.shuffle(keys)
+    items = [(key, key) for key in keys]
+    lookups = zipf_keys(keys, count, exponent)
+
+    print(f'{count} lookups over {size} keys, zipf exponent {exponent}')
+    for map_type in [BinarySearchTree, SplayTree]:
+        my_map = map_type(items)
+        seconds = time_lookups(my_map, lookups)
+        print(f'{map_type.__name__:>20}: {seconds:.3f}s')
+
+
+if __name__ == '__main__':
+    bench_skewed_lookups(exponent=0.8)
+    bench_skewed_lookups(exponent=1.1)
+    bench_skewed_lookups(exponent=1.5)
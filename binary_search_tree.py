@@ -1,6 +1,9 @@
 # binary_search_tree.py
 
-from collections.abc import MutableMapping
+from array import array
+from collections.abc import ItemsView, MutableMapping, ValuesView
+import functools
+import operator
 import typing
 
 HashableItems = typing.Iterable[
@@ -102,7 +105,7 @@ class BinarySearchTree(MutableMapping):
         Overwrite the old value if key found.
         """
         if self._root is None:
-            self._root = _BinaryNode(key, value)
+            self._root = self._new_node(key, value)
         else:
             self._root = self._root.setitem(key, value)
 
@@ -115,6 +118,10 @@ class BinarySearchTree(MutableMapping):
         else:
             self._root = self._root.delitem(key)
 
+    def _new_node(self, key, value):
+        """Create the root node of an empty tree."""
+        return _BinaryNode(key, value)
+
 
 class _BinaryNode:
     """Represent a binary tree node that stores an item.
@@ -129,6 +136,20 @@ class _BinaryNode:
         self.right = None
         self.length = 1
 
+    def spawn(self, key, value):
+        """Create a new node of the same kind as self."""
+        return type(self)(key, value)
+
+    def update(self):
+        """Recompute the augmented fields of the node from its children.
+        Must be called whenever the item or a child of the node changes.
+        """
+        self.length = 1
+        if self.left is not None:
+            self.length += self.left.length
+        if self.right is not None:
+            self.length += self.right.length
+
     def __iter__(self):
         """An inorder traversal over child nodes"""
         if self.left is not None:
@@ -222,25 +243,20 @@ class _BinaryNode:
         elif key < self.key:
             # if the node has no left child, create new node
             # otherwise, recursively call setitem on left child
-            # update length based on the change of left child's length
             if self.left is None:
-                self.left = _BinaryNode(key, value)
-                self.length += 1
+                self.left = self.spawn(key, value)
             else:
-                old_left_len = self.left.length
                 self.left = self.left.setitem(key, value)
-                self.length += self.left.length - old_left_len
 
         else:
             # similar to above, delegate to right child
             if self.right is None:
-                self.right = _BinaryNode(key, value)
-                self.length += 1
+                self.right = self.spawn(key, value)
             else:
-                old_right_len = self.right.length
                 self.right = self.right.setitem(key, value)
-                self.length += self.right.length - old_right_len
 
+        # update length and other augmented fields based on the changed child
+        self.update()
         return self
 
     def delitem(self, key):
@@ -261,12 +277,12 @@ class _BinaryNode:
                 pred_node = self.predecessor(key)
                 self.key = pred_node.key
                 self.value = pred_node.value
-                self.length -= 1
 
                 # recursively call delitem on left child
                 # the call would eventually reach pred_node and delete it
                 # pred_node has only one or no child
                 self.left = self.left.delitem(self.key)
+                self.update()
                 return self
 
         elif key < self.key and self.left is not None:
@@ -277,7 +293,7 @@ class _BinaryNode:
             except KeyError:
                 raise
             else:
-                self.length -= 1
+                self.update()
                 return self
 
         elif key > self.key and self.right is not None:
@@ -287,8 +303,789 @@ class _BinaryNode:
             except KeyError:
                 raise
             else:
-                self.length -= 1
+                self.update()
                 return self
 
         else:
             raise KeyError(f'key {key} not found')
+
+
+class WeightBalancedTree(BinarySearchTree):
+    """Implement a weight-balanced binary search tree as a sorted map.
+    The weight of a subtree is its length plus one, and the weights of the two
+    branches of every node stay within a factor of 3 of each other, so the height
+    is O(log n) whatever the insertion order. After an insertion or a deletion,
+    every node on the search path is restored by at most one single or double
+    rotation, with the parameters (3, 2) of Hirai and Yamamoto.
+    Insertions and deletions walk the search path with an explicit stack, and
+    rotations call update() on the rotated nodes, so subclasses can keep their
+    augmented fields in update() as with BinarySearchTree.
+    """
+
+    def __setitem__(self, key, value):
+        """Set self[key] to be value.
+        Overwrite the old value if key found.
+        """
+        path = []
+        node = self._root
+        while node is not None and key != node.key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+
+        if node is not None:
+            # the value may change the augmented fields of the node
+            node.value = value
+            node.update()
+        else:
+            node = self._new_node(key, value)
+            if not path:
+                self._root = node
+            elif key < path[-1].key:
+                path[-1].left = node
+            else:
+                path[-1].right = node
+
+        self._rebalance_path(path)
+
+    def __delitem__(self, key):
+        """Delete self[key].
+        Raise a KeyError if no such key found.
+        """
+        path = []
+        node = self._root
+        while node is not None and key != node.key:
+            path.append(node)
+            node = node.left if key < node.key else node.right
+        if node is None:
+            raise KeyError(f'key {key} not found')
+
+        if node.left is not None and node.right is not None:
+            # replace the item of the node by that of its predecessor,
+            # which is then deleted instead and has no right child
+            path.append(node)
+            pred_node = node.left
+            while pred_node.right is not None:
+                path.append(pred_node)
+                pred_node = pred_node.right
+            node.key, node.value = pred_node.key, pred_node.value
+            node = pred_node
+
+        # the node has at most one child, which takes its place
+        child = node.left if node.left is not None else node.right
+        if not path:
+            self._root = child
+        elif path[-1].left is node:
+            path[-1].left = child
+        else:
+            path[-1].right = child
+
+        self._rebalance_path(path)
+
+    def _rebalance_path(self, path):
+        """Update and rebalance the nodes along a search path from the bottom up,
+        attaching the new root of every subtree to its parent.
+        """
+        while path:
+            node = path.pop()
+            balanced = _balance(node)
+            if not path:
+                self._root = balanced
+            elif path[-1].left is node:
+                path[-1].left = balanced
+            else:
+                path[-1].right = balanced
+
+
+def _weight(node):
+    """Return the weight of a subtree, which is its length plus one."""
+    return 1 if node is None else node.length + 1
+
+
+def _rotate_left(node):
+    """Rotate the right child of the node up, and return it."""
+    right = node.right
+    node.right = right.left
+    right.left = node
+    node.update()
+    right.update()
+    return right
+
+
+def _rotate_right(node):
+    """Rotate the left child of the node up, and return it."""
+    left = node.left
+    node.left = left.right
+    left.right = node
+    node.update()
+    left.update()
+    return left
+
+
+def _balance(node):
+    """Update the node, and restore the balance between its branches if one of them
+    has become more than 3 times as heavy as the other. Return the new subtree root.
+    """
+    node.update()
+    left_weight = _weight(node.left)
+    right_weight = _weight(node.right)
+
+    if right_weight > 3 * left_weight:
+        # a single rotation if the outer grandchild is heavy enough, otherwise double
+        right = node.right
+        if _weight(right.left) >= 2 * _weight(right.right):
+            node.right = _rotate_right(right)
+        return _rotate_left(node)
+
+    elif left_weight > 3 * right_weight:
+        left = node.left
+        if _weight(left.right) >= 2 * _weight(left.left):
+            node.left = _rotate_left(left)
+        return _rotate_right(node)
+
+    return node
+
+
+# a placeholder for the aggregate of no values
+_EMPTY = object()
+
+
+def _combine(func, first, second):
+    """Combine two partial aggregates, either of which may be _EMPTY."""
+    if first is _EMPTY:
+        return second
+    elif second is _EMPTY:
+        return first
+    else:
+        return func(first, second)
+
+
+class AggregateTree(WeightBalancedTree):
+    """Implement a binary search tree that also maintains, at every node, the
+    aggregate of the values in its subtree under a user-supplied function.
+    The function must be associative (e.g. operator.add, min or max), so that
+    the aggregate over any range of keys can be assembled from O(height)
+    subtree aggregates. It need not be commutative, values are always
+    combined in ascending order of keys.
+    The tree is weight-balanced, so keys arriving in order, like time buckets,
+    still give a height of O(log n) and range aggregates in O(log n) time.
+    """
+
+    def __init__(self, items: typing.Optional[HashableItems] = None, combine=operator.add):
+        """
+        :argument:
+        items (iterable of tuples): an iterable of (key, value) pairs
+        combine (function): an associative binary function of values
+        """
+        self._node_type = _aggregate_node_type(combine)
+        super().__init__(items)
+
+    def _new_node(self, key, value):
+        return self._node_type(key, value)
+
+    def aggregate(self, low, high, default=_EMPTY):
+        """Return the aggregate of the values whose keys satisfy low <= key <= high.
+        If no key lies in the range, return default if given, otherwise raise a KeyError.
+        """
+        result = _EMPTY
+        if self._root is not None:
+            result = self._root.range_aggregate(low, high)
+
+        if result is not _EMPTY:
+            return result
+        elif default is not _EMPTY:
+            return default
+        else:
+            raise KeyError(f'No key between {low} and {high}')
+
+
+class _AggregateNode(_BinaryNode):
+    """Represent a binary tree node that also stores the aggregate of the
+    values in its subtree.
+    The function combine is a class attribute of the subclasses made by
+    _aggregate_node_type, so that the nodes do not store it one by one.
+    """
+    __slots__ = 'total',
+    combine = None
+
+    def __init__(self, key, value):
+        super().__init__(key, value)
+        self.total = value
+
+    def update(self):
+        super().update()
+        total = self.value
+        if self.left is not None:
+            total = self.combine(self.left.total, total)
+        if self.right is not None:
+            total = self.combine(total, self.right.total)
+        self.total = total
+
+    def range_aggregate(self, low, high):
+        """Return the aggregate of the values in the subtree whose keys satisfy
+        low <= key <= high, or _EMPTY if there is no such key.
+        """
+        # find the topmost node inside the range, where the search paths
+        # towards low and towards high split
+        node = self
+        while node is not None and not low <= node.key <= high:
+            node = node.left if high < node.key else node.right
+        if node is None:
+            return _EMPTY
+
+        func = node.combine
+
+        # on the way down to low, every node with key >= low contributes
+        # itself and its whole right branch, from right to left
+        left_part = _EMPTY
+        cur = node.left
+        while cur is not None:
+            if cur.key >= low:
+                part = cur.value
+                if cur.right is not None:
+                    part = func(part, cur.right.total)
+                left_part = _combine(func, part, left_part)
+                cur = cur.left
+            else:
+                cur = cur.right
+
+        # similarly on the way down to high, from left to right
+        right_part = _EMPTY
+        cur = node.right
+        while cur is not None:
+            if cur.key <= high:
+                part = cur.value
+                if cur.left is not None:
+                    part = func(cur.left.total, part)
+                right_part = _combine(func, right_part, part)
+                cur = cur.right
+            else:
+                cur = cur.left
+
+        result = _combine(func, left_part, node.value)
+        return _combine(func, result, right_part)
+
+
+@functools.lru_cache(maxsize=None)
+def _aggregate_node_type(combine):
+    """Return the subclass of _AggregateNode that combines values with the given
+    function, shared by all trees using the same function.
+    """
+    return type('_AggregateNode', (_AggregateNode,),
+                {'__slots__': (), 'combine': staticmethod(combine)})
+
+
+def _splay(root, key):
+    """Bring the node with the given key to the root by zig, zig-zig and
+    zig-zag rotations. If the key is not found, bring up the last node on the
+    search path instead, which holds either the predecessor or the successor.
+    Return the new root.
+    """
+    # record the search path, which is the chain of ancestors of the node
+    path = []
+    node = root
+    while node is not None:
+        path.append(node)
+        if key == node.key:
+            break
+        node = node.left if key < node.key else node.right
+
+    node = path.pop()
+    if not path:
+        return node
+
+    while path:
+        parent = path.pop()
+        if not path:
+            # zig: the parent is the root
+            if node is parent.left:
+                parent.left = node.right
+                node.right = parent
+            else:
+                parent.right = node.left
+                node.left = parent
+            parent.update()
+            break
+
+        grand = path.pop()
+        if parent is grand.left:
+            if node is parent.left:
+                # zig-zig: the grandparent and then the parent go down to the right
+                grand.left = parent.right
+                parent.right = grand
+                parent.left = node.right
+                node.right = parent
+                grand.update()
+                parent.update()
+            else:
+                # zig-zag: the node goes up between the parent and the grandparent
+                parent.right = node.left
+                grand.left = node.right
+                node.left = parent
+                node.right = grand
+                parent.update()
+                grand.update()
+        else:
+            # mirror images of the two cases above
+            if node is parent.right:
+                grand.right = parent.left
+                parent.left = grand
+                parent.right = node.left
+                node.left = parent
+                grand.update()
+                parent.update()
+            else:
+                parent.left = node.right
+                grand.right = node.left
+                node.right = parent
+                node.left = grand
+                parent.update()
+                grand.update()
+
+        # the node takes the place of the grandparent
+        if path:
+            if path[-1].left is grand:
+                path[-1].left = node
+            else:
+                path[-1].right = node
+
+    # the children of the node are final only after the last rotation
+    node.update()
+    return node
+
+
+class SplayTree(BinarySearchTree):
+    """Implement a splay tree as a sorted map.
+    Every access moves the accessed node to the root, so that frequently used keys
+    stay near the top. Any sequence of operations takes O(log n) amortized time per
+    operation, and skewed workloads with a few hot keys are much faster in practice.
+    A splay tree may temporarily become a long chain, so all methods are iterative.
+    """
+
+    def _nodes(self):
+        """An iterative inorder traversal over all nodes, with an explicit stack."""
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.right
+
+    def __iter__(self):
+        """Iterate over the keys in ascending order."""
+        for node in self._nodes():
+            yield node.key
+
+    def items(self):
+        """Return a view of the (key, value) pairs in ascending order of keys.
+        Unlike the inherited view, it reads the values off the nodes instead of
+        looking up every key, since a lookup would splay the tree under the iterator.
+        """
+        return _SplayItemsView(self)
+
+    def values(self):
+        """Return a view of the values in ascending order of keys, without splaying."""
+        return _SplayValuesView(self)
+
+    """Ordering methods"""
+
+    def minimum(self):
+        """Return the (key, value) pair with the minimum key.
+        Raise a KeyError if the tree is empty.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        node = self._root
+        while node.left is not None:
+            node = node.left
+        self._root = _splay(self._root, node.key)
+        return node.key, node.value
+
+    def maximum(self):
+        """Return the (key, value) pair with the maximum key
+        Raise a KeyError if the tree is empty.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        node = self._root
+        while node.right is not None:
+            node = node.right
+        self._root = _splay(self._root, node.key)
+        return node.key, node.value
+
+    def predecessor(self, key):
+        """Return the (key, value) pair with the largest key that is strictly
+        less than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly less than the given key.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        # after splaying, the root is either the predecessor itself,
+        # or the predecessor is the maximum of the left branch
+        self._root = _splay(self._root, key)
+        node = self._root
+        if node.key >= key:
+            node = node.left
+            if node is None:
+                raise KeyError(f'No key less than {key}')
+            while node.right is not None:
+                node = node.right
+        return node.key, node.value
+
+    def successor(self, key):
+        """Return the (key, value) pair with the smallest key that is strictly
+        greater than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly greater than the given key.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        # the logic is similar to finding the predecessor
+        self._root = _splay(self._root, key)
+        node = self._root
+        if node.key <= key:
+            node = node.right
+            if node is None:
+                raise KeyError(f'No key greater than {key}')
+            while node.left is not None:
+                node = node.left
+        return node.key, node.value
+
+    """Accessor methods"""
+
+    def __getitem__(self, key):
+        """Get the value corresponding to the key, and splay it to the root.
+        Raise a KeyError if no such key found.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        self._root = _splay(self._root, key)
+        if self._root.key != key:
+            raise KeyError(f'key {key} not found')
+        else:
+            return self._root.value
+
+    def __setitem__(self, key, value):
+        """Set self[key] to be value, and splay it to the root.
+        Overwrite the old value if key found.
+        """
+        if self._root is None:
+            self._root = self._new_node(key, value)
+            return
+
+        root = _splay(self._root, key)
+        if key == root.key:
+            root.value = value
+            root.update()
+            self._root = root
+            return
+
+        # the old root is the predecessor or the successor of the new key,
+        # split the tree around it under the new root
+        new_root = root.spawn(key, value)
+        if key < root.key:
+            new_root.left = root.left
+            new_root.right = root
+            root.left = None
+        else:
+            new_root.right = root.right
+            new_root.left = root
+            root.right = None
+        root.update()
+        new_root.update()
+        self._root = new_root
+
+    def __delitem__(self, key):
+        """Delete self[key].
+        Raise a KeyError if no such key found.
+        """
+        if self._root is None:
+            raise KeyError('empty tree')
+
+        root = _splay(self._root, key)
+        if root.key != key:
+            self._root = root
+            raise KeyError(f'key {key} not found')
+
+        if root.left is None:
+            self._root = root.right
+        else:
+            # every key on the left is less than the deleted key, so splaying
+            # it brings the maximum of the left branch, which has no right child
+            new_root = _splay(root.left, key)
+            new_root.right = root.right
+            new_root.update()
+            self._root = new_root
+
+
+class _SplayItemsView(ItemsView):
+    """An items view of a SplayTree that never splays while iterating."""
+
+    def __iter__(self):
+        for node in self._mapping._nodes():
+            yield node.key, node.value
+
+
+class _SplayValuesView(ValuesView):
+    """A values view of a SplayTree that never splays while iterating."""
+
+    def __iter__(self):
+        for node in self._mapping._nodes():
+            yield node.value
+
+
+# the null node id in ArenaBinarySearchTree
+_NIL = -1
+
+
+class ArenaBinarySearchTree(MutableMapping):
+    """Implement a binary search tree as a sorted map, with the same interface
+    and the same shape as BinarySearchTree.
+    Instead of one object per node, the nodes live in an arena of parallel columns
+    indexed by int node ids: two lists for the keys and values, and three
+    array('l') for the left child, the right child and the subtree length.
+    The ids of deleted nodes are kept in a free list and reused by later inserts.
+    """
+
+    def __init__(self, items: typing.Optional[HashableItems] = None):
+        """
+        :argument:
+        items (iterable of tuples): an iterable of (key, value) pairs
+        """
+        self._root = _NIL
+        self._keys = []
+        self._values = []
+        self._left = array('l')
+        self._right = array('l')
+        self._length = array('l')
+        self._free = []
+
+        if items is not None:
+            for key, value in items:
+                self[key] = value
+
+    def __len__(self):
+        """Return the number of items."""
+        if self._root == _NIL:
+            return 0
+        else:
+            return self._length[self._root]
+
+    def __iter__(self):
+        """Iterate over the keys in ascending order."""
+        # an iterative inorder traversal with an explicit stack
+        stack = []
+        node = self._root
+        while stack or node != _NIL:
+            if node != _NIL:
+                stack.append(node)
+                node = self._left[node]
+            else:
+                node = stack.pop()
+                yield self._keys[node]
+                node = self._right[node]
+
+    """Helper methods"""
+
+    def _new_node(self, key, value):
+        """Allocate a leaf node, reusing a free id if there is any."""
+        if self._free:
+            node = self._free.pop()
+            self._keys[node] = key
+            self._values[node] = value
+            self._left[node] = _NIL
+            self._right[node] = _NIL
+            self._length[node] = 1
+        else:
+            node = len(self._keys)
+            self._keys.append(key)
+            self._values.append(value)
+            self._left.append(_NIL)
+            self._right.append(_NIL)
+            self._length.append(1)
+        return node
+
+    def _free_node(self, node):
+        """Release a node id, dropping the references to its key and value."""
+        self._keys[node] = None
+        self._values[node] = None
+        self._free.append(node)
+
+    def _find(self, key):
+        """Return the id of the node with the given key, or _NIL if not found."""
+        node = self._root
+        while node != _NIL:
+            node_key = self._keys[node]
+            if key == node_key:
+                return node
+            elif key < node_key:
+                node = self._left[node]
+            else:
+                node = self._right[node]
+        return _NIL
+
+    def _item(self, node):
+        return self._keys[node], self._values[node]
+
+    """Ordering methods"""
+
+    def minimum(self):
+        """Return the (key, value) pair with the minimum key.
+        Raise a KeyError if the tree is empty.
+        """
+        if self._root == _NIL:
+            raise KeyError('empty tree')
+
+        node = self._root
+        while self._left[node] != _NIL:
+            node = self._left[node]
+        return self._item(node)
+
+    def maximum(self):
+        """Return the (key, value) pair with the maximum key
+        Raise a KeyError if the tree is empty.
+        """
+        if self._root == _NIL:
+            raise KeyError('empty tree')
+
+        node = self._root
+        while self._right[node] != _NIL:
+            node = self._right[node]
+        return self._item(node)
+
+    def predecessor(self, key):
+        """Return the (key, value) pair with the largest key that is strictly
+        less than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly less than the given key.
+        """
+        if self._root == _NIL:
+            raise KeyError('empty tree')
+
+        # the last node at which the search turns right is the predecessor
+        pred_node = _NIL
+        node = self._root
+        while node != _NIL:
+            if key <= self._keys[node]:
+                node = self._left[node]
+            else:
+                pred_node = node
+                node = self._right[node]
+
+        if pred_node == _NIL:
+            raise KeyError(f'No key less than {key}')
+        else:
+            return self._item(pred_node)
+
+    def successor(self, key):
+        """Return the (key, value) pair with the smallest key that is strictly
+        greater than the given key, regardless of whether the given key exists in the tree.
+        Raise a KeyError if the tree is empty or no key is strictly greater than the given key.
+        """
+        if self._root == _NIL:
+            raise KeyError('empty tree')
+
+        # the logic is similar to finding the predecessor
+        succ_node = _NIL
+        node = self._root
+        while node != _NIL:
+            if key >= self._keys[node]:
+                node = self._right[node]
+            else:
+                succ_node = node
+                node = self._left[node]
+
+        if succ_node == _NIL:
+            raise KeyError(f'No key greater than {key}')
+        else:
+            return self._item(succ_node)
+
+    """Accessor methods"""
+
+    def __getitem__(self, key):
+        """Get the value corresponding to the key.
+        Raise a KeyError if no such key found.
+        """
+        node = self._find(key)
+        if node == _NIL:
+            raise KeyError(f'key {key} not found')
+        else:
+            return self._values[node]
+
+    def __setitem__(self, key, value):
+        """Set self[key] to be value.
+        Overwrite the old value if key found.
+        """
+        node = self._find(key)
+        if node != _NIL:
+            self._values[node] = value
+            return
+
+        new_node = self._new_node(key, value)
+        if self._root == _NIL:
+            self._root = new_node
+            return
+
+        # the key is new, so every node on the way down gains one descendant
+        keys, left, right, length = self._keys, self._left, self._right, self._length
+        node = self._root
+        while True:
+            length[node] += 1
+            if key < keys[node]:
+                if left[node] == _NIL:
+                    left[node] = new_node
+                    return
+                node = left[node]
+            else:
+                if right[node] == _NIL:
+                    right[node] = new_node
+                    return
+                node = right[node]
+
+    def __delitem__(self, key):
+        """Delete self[key].
+        Raise a KeyError if no such key found.
+        """
+        if self._find(key) == _NIL:
+            raise KeyError(f'key {key} not found')
+
+        # the key exists, so every node on the way down loses one descendant
+        keys, left, right, length = self._keys, self._left, self._right, self._length
+        parent = _NIL
+        node = self._root
+        while key != keys[node]:
+            length[node] -= 1
+            parent = node
+            node = left[node] if key < keys[node] else right[node]
+
+        if left[node] != _NIL and right[node] != _NIL:
+            # if the node has two children, replace it by its predecessor
+            # (slight bias in favour of cutting the left branch)
+            # the predecessor has no right child and is removed instead
+            length[node] -= 1
+            parent = node
+            pred_node = left[node]
+            while right[pred_node] != _NIL:
+                length[pred_node] -= 1
+                parent = pred_node
+                pred_node = right[pred_node]
+
+            keys[node] = keys[pred_node]
+            self._values[node] = self._values[pred_node]
+            node = pred_node
+
+        # the node has only one or no child, promote that child
+        child = right[node] if left[node] == _NIL else left[node]
+        if parent == _NIL:
+            self._root = child
+        elif left[parent] == node:
+            left[parent] = child
+        else:
+            right[parent] = child
+        self._free_node(node)
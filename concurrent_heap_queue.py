@@ -0,0 +1,163 @@
+import asyncio
+import collections
+import queue
+import threading
+
+from heap_queue import HeapQueue
+
+
+class ThreadSafeHeapQueue:
+    """Wrap a priority queue with the HeapQueue interface for use by multiple threads.
+    Pushing an existing item still updates its key, so the priorities of waiting
+    jobs can be re-scored at any time.
+    Popping from an empty queue blocks until some item is pushed. The waiting
+    threads sleep on a condition variable and each push wakes only one of them.
+    """
+
+    def __init__(self, entries=None, heap_type=HeapQueue):
+        """
+        :argument:
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        heap_type (class): the underlying priority queue class
+        """
+        self._heap = heap_type() if entries is None else heap_type(entries)
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+
+    def __contains__(self, item):
+        """Return True if the item is in the queue."""
+        with self._lock:
+            return item in self._heap
+
+    def __len__(self):
+        """Number of entries remaining in the queue."""
+        with self._lock:
+            return len(self._heap)
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        with self._lock:
+            return self._heap[item]
+
+    def peek(self):
+        """Return the item with the minimum key without waiting.
+        Raise an IndexError if the queue is empty."""
+        with self._lock:
+            return self._heap.peek()
+
+    def push(self, item, key):
+        """Push an item into the queue with a given key, and wake up a waiting thread.
+        If the item already exists, update its key instead.
+        """
+        with self._not_empty:
+            self._heap.push(item, key)
+            self._not_empty.notify()
+
+    def pop(self, block=True, timeout=None):
+        """Remove the item with the minimum key.
+        The resulting (item, key) pair is also returned.
+        If block is True, wait until an item is available, for at most timeout
+        seconds if timeout is not None. Raise a queue.Empty if no item is available.
+        """
+        with self._not_empty:
+            if not block:
+                if not self._heap:
+                    raise queue.Empty
+            elif not self._not_empty.wait_for(lambda: len(self._heap), timeout):
+                raise queue.Empty
+            return self._heap.pop()
+
+    def discard(self, item):
+        """Remove an item from the queue if it exists.
+        The underlying heap must support discard."""
+        with self._lock:
+            self._heap.discard(item)
+
+
+class AsyncHeapQueue:
+    """Wrap a priority queue with the HeapQueue interface for use by asyncio tasks.
+    Pushing an existing item still updates its key, so the priorities of waiting
+    jobs can be re-scored at any time.
+    Popping from an empty queue suspends the task until some item is pushed. Each
+    waiting task parks on its own future, and each push resolves only one of them.
+    Like the other asyncio queues, it is not thread-safe.
+    """
+
+    def __init__(self, entries=None, heap_type=HeapQueue):
+        """
+        :argument:
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        heap_type (class): the underlying priority queue class
+        """
+        self._heap = heap_type() if entries is None else heap_type(entries)
+        self._getters = collections.deque()
+
+    def __contains__(self, item):
+        """Return True if the item is in the queue."""
+        return item in self._heap
+
+    def __len__(self):
+        """Number of entries remaining in the queue."""
+        return len(self._heap)
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        return self._heap[item]
+
+    def _wake_next(self):
+        """Wake up the first task still waiting for an item."""
+        while self._getters:
+            getter = self._getters.popleft()
+            if not getter.done():
+                getter.set_result(None)
+                return
+
+    def peek(self):
+        """Return the item with the minimum key without waiting.
+        Raise an IndexError if the queue is empty."""
+        return self._heap.peek()
+
+    def push(self, item, key):
+        """Push an item into the queue with a given key, and wake up a waiting task.
+        If the item already exists, update its key instead.
+        """
+        self._heap.push(item, key)
+        self._wake_next()
+
+    def pop_nowait(self):
+        """Remove the item with the minimum key without waiting.
+        The resulting (item, key) pair is also returned.
+        Raise an asyncio.QueueEmpty if the queue is empty.
+        """
+        if not self._heap:
+            raise asyncio.QueueEmpty
+        return self._heap.pop()
+
+    async def pop(self):
+        """Remove the item with the minimum key, waiting until an item is available.
+        The resulting (item, key) pair is also returned.
+        """
+        while not self._heap:
+            getter = asyncio.get_running_loop().create_future()
+            self._getters.append(getter)
+            try:
+                await getter
+            except BaseException:
+                getter.cancel()
+                try:
+                    self._getters.remove(getter)
+                except ValueError:
+                    pass
+
+                # if this task was woken up but cancelled, pass the item on
+                if self._heap and not getter.cancelled():
+                    self._wake_next()
+                raise
+        return self._heap.pop()
+
+    def discard(self, item):
+        """Remove an item from the queue if it exists.
+        The underlying heap must support discard."""
+        self._heap.discard(item)
@@ -0,0 +1,297 @@
+import collections
+import concurrent.futures
+import itertools
+import os
+import pickle
+import time
+
+from partition import Partition
+
+
+def _shards(edges, shard_size):
+    """Split an iterable of edges into lists of at most shard_size edges."""
+    edges = iter(edges)
+    while True:
+        shard = list(itertools.islice(edges, shard_size))
+        if not shard:
+            return
+        yield shard
+
+
+def _forest_roots(forest):
+    """Return the components of a partition as a tuple (roots, items, item_roots),
+    in which roots is a list of the roots, and the parallel lists items and
+    item_roots hold every other item and its root. Flat lists are cheaper to pass
+    between processes than lists of pairs.
+    """
+    roots = []
+    items = []
+    item_roots = []
+    for item in forest:
+        root = forest.find(item)
+        if root == item:
+            roots.append(root)
+        else:
+            items.append(item)
+            item_roots.append(root)
+    return roots, items, item_roots
+
+
+def _merge_roots(forest, components):
+    """Unite the components given as a tuple like _forest_roots into a partition."""
+    roots, items, item_roots = components
+    for root in roots:
+        forest.add_item(root)
+    for item, root in zip(items, item_roots):
+        forest.add_item(item)
+        forest.union(item, root)
+
+
+def _shard_roots(shard):
+    """Find the components of a shard of edges with a local partition,
+    and return them as a tuple like _forest_roots.
+    """
+    forest = Partition([])
+    for start, end in shard:
+        forest.add_item(start)
+        forest.add_item(end)
+        forest.union(start, end)
+    return _forest_roots(forest)
+
+
+def _reduce_roots(components1, components2):
+    """Unite the components of two sets of edges, each given as a tuple like
+    _forest_roots, and return those of their union in the same form.
+    """
+    forest = Partition([])
+    _merge_roots(forest, components1)
+    _merge_roots(forest, components2)
+    return _forest_roots(forest)
+
+
+def connected_components(edges, workers=None, shard_size=100_000):
+    """Find the connected components of the graph given by an iterable of
+    (start, end) edges, whose items must be hashable and picklable.
+    The edges are split into shards of shard_size edges, which are sent to a pool
+    of worker processes. Each worker finds the components of its shard with a
+    local Partition, and returns them as the list of roots and the roots of the
+    other items, which has one entry per distinct item however many edges the
+    shard has. The results are then united pairwise by the pool as
+    well, as a balanced tree, so the parent process only labels the items with
+    the last result.
+    At most two shards per worker are in flight, so the edges are never all in
+    memory at the same time.
+    Return a tuple (labels, sizes), in which labels maps every item to the root of
+    its component, and sizes maps every root to the size of its component.
+    :argument:
+    edges (iterable): an iterable of (start, end) pairs
+    workers (int): the number of worker processes, by default the number of CPUs,
+        and 1 to find the components in the current process
+    shard_size (int): the number of edges sent to a worker at a time
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if workers == 1:
+        components = _shard_roots(edges)
+    else:
+        # the results ready to be united, by the number of reductions behind them,
+        # so that results of similar sizes meet and every item is passed on
+        # O(log shards) times
+        levels = collections.defaultdict(list)
+        with concurrent.futures.ProcessPoolExecutor(workers) as executor:
+            shards = _shards(edges, shard_size)
+            pending = {}
+            while True:
+                # keep the pool busy without reading too many shards ahead
+                while len(pending) < 2 * workers:
+                    shard = next(shards, None)
+                    if shard is None:
+                        break
+                    pending[executor.submit(_shard_roots, shard)] = 0
+
+                if not pending:
+                    # no more shards, unite what is left from the lowest level up
+                    ready = [result for level in sorted(levels) for result in levels[level]]
+                    if len(ready) < 2:
+                        break
+                    levels.clear()
+                    levels[0] = ready[2:]
+                    pending[executor.submit(_reduce_roots, ready[0], ready[1])] = 0
+                    continue
+
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    level = pending.pop(future)
+                    results = levels[level]
+                    results.append(future.result())
+                    if len(results) == 2:
+                        del levels[level]
+                        pending[executor.submit(_reduce_roots, *results)] = level + 1
+
+        ready = [result for results in levels.values() for result in results]
+        components = ready[0] if ready else ([], [], [])
+
+    roots, items, item_roots = components
+    labels = {root: root for root in roots}
+    labels.update(zip(items, item_roots))
+    sizes = collections.Counter(labels.values())
+    return labels, dict(sizes)
+
+
+class EdgeFile:
+    """Iterate over the edges of a text file, one whitespace-separated pair of items
+    per line. Empty lines and lines starting with # are skipped.
+    The byte offset just past the last edge read is kept in the attribute offset,
+    and the next iteration starts from it, so that a stream can be resumed
+    without reading the edges before it again.
+    """
+
+    def __init__(self, path, item_type=str, offset=0):
+        """
+        :argument:
+        path (str): the path of the edge file
+        item_type (callable): the function converting each field to an item
+        offset (int): the byte offset to start reading from
+        """
+        self.path = path
+        self.item_type = item_type
+        self.offset = offset
+
+    def __iter__(self):
+        item_type = self.item_type
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            for line in file:
+                # move past the line before yielding its edge
+                self.offset += len(line)
+                fields = line.split()
+                if fields and not fields[0].startswith(b'#'):
+                    yield item_type(fields[0].decode()), item_type(fields[1].decode())
+
+
+def read_edges(path, item_type=str):
+    """Return an EdgeFile iterating over the edges of a text file."""
+    return EdgeFile(path, item_type)
+
+
+def _save_checkpoint(path, state):
+    """Pickle the state to the path through a temporary file, so that a crash
+    never leaves a broken checkpoint.
+    """
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as file:
+        pickle.dump(state, file, pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def stream_components(edges, chunk_size=100_000, progress=None, checkpoint=None,
+                      checkpoint_every=60.0):
+    """Find the connected components of the graph given by an iterable of
+    (start, end) edges in a single pass, keeping only a Partition in memory.
+    Items are added to the partition when they first appear, and the edges are
+    consumed in chunks of chunk_size edges.
+    After every chunk, progress is called with the number of edges read so far
+    and the partition, whose len and group_count give the numbers of items and
+    components. If checkpoint is given, the partition is also saved to that path
+    after the first chunk that ends checkpoint_every seconds after the last save,
+    and once more at the end. A run given the same edges and checkpoint later
+    resumes from the saved state. An EdgeFile seeks to the saved byte offset,
+    other iterables have to skip the edges already read.
+    Return the resulting Partition.
+    :argument:
+    edges (iterable): an iterable of (start, end) pairs, e.g. from read_edges
+    chunk_size (int): the number of edges between two progress reports
+    progress (callable): called as progress(edge_count, partition) after every chunk
+    checkpoint (str): the path of the checkpoint file
+    checkpoint_every (float): the least number of seconds between two checkpoints
+    """
+    forest = Partition([])
+    edge_count = 0
+
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint, 'rb') as file:
+            edge_count, offset, forest = pickle.load(file)
+        if isinstance(edges, EdgeFile) and offset is not None:
+            edges.offset = offset
+        else:
+            edges = itertools.islice(edges, edge_count, None)
+
+    def save():
+        offset = edges.offset if isinstance(edges, EdgeFile) else None
+        _save_checkpoint(checkpoint, (edge_count, offset, forest))
+
+    last_save = time.monotonic()
+    for chunk in _shards(edges, chunk_size):
+        for start, end in chunk:
+            forest.add_item(start)
+            forest.add_item(end)
+            forest.union(start, end)
+        edge_count += len(chunk)
+
+        if checkpoint is not None and time.monotonic() - last_save >= checkpoint_every:
+            save()
+            last_save = time.monotonic()
+
+        if progress is not None:
+            progress(edge_count, forest)
+
+    if checkpoint is not None:
+        save()
+    return forest
+
+
+if __name__ == '__main__':
+    """Compare the parallel and the single-process results on a random graph."""
+    import random
+
+    node_count = 200_000
+    edges = [(random.randrange(node_count), random.randrange(node_count))
+             for _ in range(node_count // 2)]
+
+    begin = time.perf_counter()
+    expected_labels, expected_sizes = connected_components(edges, workers=1)
+    print(f'1 worker: {time.perf_counter() - begin:.3f}s')
+
+    # use at least two workers to go through the process pool
+    workers = max(os.cpu_count() or 1, 2)
+    begin = time.perf_counter()
+    labels, sizes = connected_components(edges, workers, shard_size=10_000)
+    print(f'{workers} workers: {time.perf_counter() - begin:.3f}s')
+
+    # the roots may differ, but the components must be the same
+    same_components = len({(labels[item], expected_labels[item]) for item in labels}) \
+        == len(sizes) == len(expected_sizes)
+    print('same components?', same_components)
+    print('sizes sum up to the number of items?', sum(sizes.values()) == len(labels))
+    print('largest component:', max(sizes.values()))
+
+    # stream the same edges from a file, stopping halfway and resuming
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as directory:
+        edge_path = os.path.join(directory, 'edges.txt')
+        with open(edge_path, 'w') as file:
+            file.write('# start end\n')
+            for start, end in edges:
+                file.write(f'{start} {end}\n')
+
+        def stop_halfway(edge_count, forest):
+            print(f'{edge_count} edges, {len(forest)} items, {forest.group_count} groups')
+            if edge_count >= len(edges) // 2:
+                raise KeyboardInterrupt
+
+        checkpoint_path = os.path.join(directory, 'checkpoint.pickle')
+        try:
+            stream_components(read_edges(edge_path, int), 20_000, stop_halfway,
+                              checkpoint_path, checkpoint_every=0)
+        except KeyboardInterrupt:
+            print('interrupted, resuming')
+        forest = stream_components(read_edges(edge_path, int), 20_000,
+                                   lambda edge_count, forest: print(f'{edge_count} edges'),
+                                   checkpoint_path)
+
+    print('same components?',
+          len({(forest.find(item), labels[item]) for item in labels})
+          == forest.group_count == len(sizes))
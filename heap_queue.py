@@ -1,26 +1,56 @@
+from array import array
+import heapq
+import itertools
+
+
 class HeapQueue:
     """Implement a priority queue in the form of a min-heap.
     Each entry is an (item, key) pair. Item with a lower key has a higher priority.
     Item must be hashable and unique. No duplicate items.
     Pushing an existing item would update its key instead.
+    The items and the keys are stored in two parallel lists, so that updating a
+    key overwrites a slot in place instead of allocating a new entry. If all keys
+    are floats, pass typecode='d' to keep them unboxed in an array('d').
+    If maxsize is given, the heap is bounded and keeps only the maxsize entries
+    with the largest keys, which suits streaming top-k jobs. When the heap is full,
+    a new item is rejected in O(1) if its key is not larger than the minimum,
+    otherwise it evicts the entry with the minimum key.
     """
 
-    def __init__(self, entries=None):
+    def __init__(self, entries=None, arity=2, maxsize=None, typecode=None):
         """
         :argument:
         entries (iterable of tuples): an iterable of (item, key) pairs
+        arity (int): the number of children of every node, at least 2
+        maxsize (int): the maximum number of entries, or None if unbounded
+        typecode (str): the array typecode of the keys, or None to keep them in a list
         """
-        if entries is None:
-            self._entries = []
-            self._indices = {}
-        else:
-            self._entries = list(entries)
-            self._indices = {item: idx for idx, (item, _) in enumerate(self._entries)}
+        if arity < 2:
+            raise ValueError('arity must be at least 2')
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        self._arity = arity
+        self._maxsize = maxsize
+
+        self._items = []
+        self._keys = [] if typecode is None else array(typecode)
+        self._indices = {}
+
+        if entries is not None:
+            for item, key in entries:
+                self._indices[item] = len(self._items)
+                self._items.append(item)
+                self._keys.append(key)
             self._heapify()
 
+            # drop the entries with the smallest keys that exceed the bound
+            if maxsize is not None:
+                while len(self) > maxsize:
+                    self.pop()
+
     def _heapify(self):
         """Enforce the heap properties upon initializing the heap."""
-        start = len(self) // 2 - 1
+        start = (len(self) - 2) // self._arity
         for idx in range(start, -1, -1):
             self._down(idx)
 
@@ -30,62 +60,95 @@ class HeapQueue:
 
     def __len__(self):
         """Number of entries remaining in the heap."""
-        return len(self._entries)
+        return len(self._items)
 
     def __iter__(self):
         """Iterate over all items."""
-        for item, _ in self._entries:
-            yield item
+        yield from self._items
 
     """Helper methods"""
 
-    def _swap(self, idx1, idx2):
-        """Swap two entries."""
-        item1, _ = self._entries[idx1]
-        item2, _ = self._entries[idx2]
-        self._indices[item1] = idx2
-        self._indices[item2] = idx1
-        self._entries[idx1], self._entries[idx2] = self._entries[idx2], self._entries[idx1]
-
     def _up(self, idx):
-        """Bring a violating entry up to its correct position recursively."""
-        if idx == 0:
-            return
+        """Bring a violating entry up to its correct position.
+        Instead of swapping at every level, the parents with larger keys are moved
+        down into a hole that travels up, and the entry is written once at the end.
+        """
+        items, keys, indices = self._items, self._keys, self._indices
+        arity = self._arity
+        item = items[idx]
+        key = keys[idx]
 
-        parent = (idx - 1) // 2
-        # compare key with the parent
-        if self._entries[idx][1] < self._entries[parent][1]:
-            self._swap(idx, parent)
-            self._up(parent)
+        while idx > 0:
+            parent = (idx - 1) // arity
+            # compare key with the parent
+            if key < keys[parent]:
+                parent_item = items[parent]
+                items[idx] = parent_item
+                keys[idx] = keys[parent]
+                indices[parent_item] = idx
+                idx = parent
+            else:
+                break
+
+        items[idx] = item
+        keys[idx] = key
+        indices[item] = idx
 
     def _smaller_child(self, idx):
-        """Find the child with smaller key. If no child, return None."""
-        left = 2 * idx + 1
+        """Find the child with the smallest key. If no child, return None."""
+        first = self._arity * idx + 1
         # case 1: no child
-        if left >= len(self):
+        if first >= len(self):
             return None
 
-        right = left + 1
-        # case 2: only left child
-        if right == len(self):
-            return left
-
-        # case 3: two children
-        if self._entries[left][1] < self._entries[right][1]:
-            return left
-        else:
-            return right
+        # case 2: compare all (possibly fewer than arity) children
+        keys = self._keys
+        last = min(first + self._arity, len(keys))
+        child = first
+        child_key = keys[first]
+        for idx in range(first + 1, last):
+            if keys[idx] < child_key:
+                child = idx
+                child_key = keys[idx]
+        return child
 
     def _down(self, idx):
-        """Bring a violating entry down to its correct position recursively."""
+        """Bring a violating entry down to its correct position.
+        Similar to _up, the smaller children are moved up into a hole that
+        travels down, and the entry is written once at the end.
+        """
+        items, keys, indices = self._items, self._keys, self._indices
+        item = items[idx]
+        key = keys[idx]
+
         child = self._smaller_child(idx)
-        if child is None:
-            return
+        while child is not None:
+            # compare key with the child with smaller key
+            if key > keys[child]:
+                child_item = items[child]
+                items[idx] = child_item
+                keys[idx] = keys[child]
+                indices[child_item] = idx
+                idx = child
+                child = self._smaller_child(idx)
+            else:
+                break
 
-        # compare key with the child with smaller key
-        if self._entries[idx][1] > self._entries[child][1]:
-            self._swap(idx, child)
-            self._down(child)
+        items[idx] = item
+        keys[idx] = key
+        indices[item] = idx
+
+    def _pop_last(self, idx):
+        """Remove the entry at the given index by moving the last entry into it.
+        Return the index of the moved entry, or None if the removed entry was last.
+        """
+        item = self._items.pop()
+        key = self._keys.pop()
+        if idx == len(self._items):
+            return None
+        self._items[idx] = item
+        self._keys[idx] = key
+        return idx
 
     """Priority queue operations"""
 
@@ -95,30 +158,44 @@ class HeapQueue:
         if item not in self._indices:
             raise KeyError(f"{item} not found")
 
-        idx = self._indices[item]
-        _, key = self._entries[idx]
-        return key
+        return self._keys[self._indices[item]]
 
     def peek(self):
         """Return the item with the minimum key."""
-        item, _ = self._entries[0]
-        return item
+        return self._items[0]
 
     def push(self, item, key):
         """Push an item into the heap with a given key.
         If the item already exists, update its key instead.
+        If the heap is bounded and full, return the (item, key) pair that is
+        evicted or rejected, otherwise return None.
         """
+        if item not in self._indices and self._maxsize is not None \
+                and len(self) >= self._maxsize:
+            # the root holds the worst entry, which the new item must beat
+            if not key > self._keys[0]:
+                return item, key
+
+            # the new entry takes the place of the root and goes down
+            evicted = self._items[0], self._keys[0]
+            del self._indices[evicted[0]]
+            self._items[0] = item
+            self._keys[0] = key
+            self._down(0)
+            return evicted
+
         if item not in self._indices:
             # insert the new item to the end and bring it up to the correct position
             idx = len(self)
-            self._entries.append((item, key))
+            self._items.append(item)
+            self._keys.append(key)
             self._indices[item] = idx
             self._up(idx)
         else:
-            # the item already exists, find its index and update its key
+            # the item already exists, find its index and update its key in place
             idx = self._indices[item]
-            item, old_key = self._entries[idx]
-            self._entries[idx] = (item, key)
+            old_key = self._keys[idx]
+            self._keys[idx] = key
 
             # bring the entry to the correct position
             if key < old_key:
@@ -129,11 +206,484 @@ class HeapQueue:
     def pop(self):
         """Remove the item with the minimum key.
         The resulting (item, key) pair is also returned."""
-        # after swapping the first and the last entry,
-        # the required entry goes from the beginning to the end
-        self._swap(0, len(self) - 1)
-        item, key = self._entries.pop()
+        item = self._items[0]
+        key = self._keys[0]
+
+        # the last entry fills the place of the first one, then goes down
+        if self._pop_last(0) is not None:
+            self._down(0)
 
         del self._indices[item]
-        self._down(0)
         return item, key
+
+    def remove(self, item):
+        """Remove an item from the heap and return its key.
+        If the item does not exist, raise a KeyError."""
+        if item not in self._indices:
+            raise KeyError(f"{item} not found")
+
+        idx = self._indices.pop(item)
+        key = self._keys[idx]
+
+        # the last entry fills the hole, then goes either up or down
+        if self._pop_last(idx) is not None:
+            moved_item = self._items[idx]
+            self._up(idx)
+            self._down(self._indices[moved_item])
+        return key
+
+    def discard(self, item):
+        """Remove an item from the heap if it exists."""
+        if item in self._indices:
+            self.remove(item)
+
+    """Batch operations"""
+
+    def push_many(self, entries):
+        """Push many (item, key) pairs into the heap, updating the keys of existing items.
+        If the batch is large relative to the heap, write all entries in place and
+        reheapify in O(n + k), instead of doing k separate sifts in O(k log n).
+        """
+        entries = list(entries)
+        size = len(self) + len(entries)
+
+        # a bounded heap has to decide on every entry as it arrives
+        if self._maxsize is not None or len(entries) * size.bit_length() <= size:
+            for item, key in entries:
+                self.push(item, key)
+            return
+
+        for item, key in entries:
+            if item in self._indices:
+                self._keys[self._indices[item]] = key
+            else:
+                self._indices[item] = len(self._items)
+                self._items.append(item)
+                self._keys.append(key)
+        self._heapify()
+
+    def pop_many(self, k):
+        """Remove the k items with the smallest keys, or all items if fewer remain.
+        Return the list of popped (item, key) pairs in ascending order of keys.
+        """
+        return [self.pop() for _ in range(min(k, len(self)))]
+
+    def nsmallest(self, k):
+        """Return the list of the k (item, key) pairs with the smallest keys in
+        ascending order of keys, without modifying the heap.
+        Only the top of the heap is searched, with a small heap of candidate
+        positions, in O(k log k) time.
+        """
+        items, keys = self._items, self._keys
+        result = []
+        if k <= 0 or not items:
+            return result
+
+        # the candidates are (key, position) pairs, the position breaks ties
+        candidates = [(keys[0], 0)]
+        while candidates and len(result) < k:
+            key, idx = heapq.heappop(candidates)
+            result.append((items[idx], key))
+
+            # the children of a popped entry become candidates
+            first = self._arity * idx + 1
+            for child in range(first, min(first + self._arity, len(items))):
+                heapq.heappush(candidates, (keys[child], child))
+        return result
+
+    def meld(self, other):
+        """Merge all entries of another heap into this one. The other heap may be
+        of any type with the same interface, and is left unchanged.
+        For an item found in both heaps, the key from the other heap wins.
+        """
+        self.push_many([(item, other[item]) for item in other])
+
+# a placeholder for the item of a stale record in LazyHeapQueue
+_REMOVED = object()
+
+
+class LazyHeapQueue:
+    """Implement a priority queue with the same interface as HeapQueue, on top of
+    the heapq module with lazy deletion.
+    Each entry is stored as a [key, seq, item] record in a plain heapq list, where
+    the sequence number breaks ties so that items are never compared. Updating or
+    removing an item only marks its old record as stale, and stale records are
+    skipped when they reach the top. Once the stale records outnumber the live
+    ones, the heap is compacted.
+    This is faster than HeapQueue when key updates are rare compared with pushes
+    and pops, since no positions have to be tracked.
+    Like HeapQueue, if maxsize is given, the heap keeps only the maxsize entries
+    with the largest keys.
+    """
+    # never compact a heap with fewer stale records than this
+    _min_stale = 64
+
+    def __init__(self, entries=None, maxsize=None):
+        """
+        :argument:
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        maxsize (int): the maximum number of entries, or None if unbounded
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        self._maxsize = maxsize
+
+        self._heap = []
+        self._records = {}
+        self._counter = itertools.count()
+        self._stale = 0
+
+        if entries is not None:
+            for item, key in entries:
+                self._heap.append(self._new_record(item, key))
+            heapq.heapify(self._heap)
+
+            # drop the entries with the smallest keys that exceed the bound
+            if maxsize is not None:
+                while len(self) > maxsize:
+                    self.pop()
+
+    def __contains__(self, item):
+        """Return True if the item is in the heap."""
+        return item in self._records
+
+    def __len__(self):
+        """Number of entries remaining in the heap."""
+        return len(self._records)
+
+    def __iter__(self):
+        """Iterate over all items."""
+        yield from self._records
+
+    """Helper methods"""
+
+    def _new_record(self, item, key):
+        """Create and return the live record of an item, marking its old record
+        as stale. The caller puts the record into the heap list.
+        """
+        if item in self._records:
+            self._mark_stale(item)
+        record = [key, next(self._counter), item]
+        self._records[item] = record
+        return record
+
+    def _mark_stale(self, item):
+        """Detach the live record of an item and return its key."""
+        record = self._records.pop(item)
+        record[2] = _REMOVED
+        self._stale += 1
+        return record[0]
+
+    def _compact(self):
+        """Drop all stale records if they outnumber the live ones."""
+        if self._stale >= self._min_stale and self._stale > len(self._records):
+            self._heap = [record for record in self._heap if record[2] is not _REMOVED]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _skip_stale(self):
+        """Pop the stale records at the top of the heap."""
+        heap = self._heap
+        while heap and heap[0][2] is _REMOVED:
+            heapq.heappop(heap)
+            self._stale -= 1
+
+    """Priority queue operations"""
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        if item not in self._records:
+            raise KeyError(f"{item} not found")
+
+        return self._records[item][0]
+
+    def peek(self):
+        """Return the item with the minimum key."""
+        self._skip_stale()
+        if not self._heap:
+            raise IndexError('peek from an empty heap')
+        return self._heap[0][2]
+
+    def push(self, item, key):
+        """Push an item into the heap with a given key.
+        If the item already exists, update its key instead.
+        If the heap is bounded and full, return the (item, key) pair that is
+        evicted or rejected, otherwise return None.
+        """
+        if item in self._records:
+            if self._records[item][0] == key:
+                return
+        elif self._maxsize is not None and len(self) >= self._maxsize:
+            # the minimum is the worst entry, which the new item must beat
+            self._skip_stale()
+            if not key > self._heap[0][0]:
+                return item, key
+
+            evicted = self.pop()
+            heapq.heappush(self._heap, self._new_record(item, key))
+            return evicted
+
+        heapq.heappush(self._heap, self._new_record(item, key))
+        self._compact()
+
+    def pop(self):
+        """Remove the item with the minimum key.
+        The resulting (item, key) pair is also returned."""
+        self._skip_stale()
+        if not self._heap:
+            raise IndexError('pop from an empty heap')
+
+        key, _, item = heapq.heappop(self._heap)
+        del self._records[item]
+        return item, key
+
+    def remove(self, item):
+        """Remove an item from the heap and return its key.
+        If the item does not exist, raise a KeyError."""
+        if item not in self._records:
+            raise KeyError(f"{item} not found")
+
+        key = self._mark_stale(item)
+        self._compact()
+        return key
+
+    def discard(self, item):
+        """Remove an item from the heap if it exists."""
+        if item in self._records:
+            self.remove(item)
+
+    """Batch operations"""
+
+    def push_many(self, entries):
+        """Push many (item, key) pairs into the heap, updating the keys of existing items.
+        If the batch is large relative to the heap, extend the heap list with all
+        records and reheapify in O(n + k), instead of doing k separate pushes.
+        """
+        entries = list(entries)
+        size = len(self._heap) + len(entries)
+
+        # a bounded heap has to decide on every entry as it arrives
+        if self._maxsize is not None or len(entries) * size.bit_length() <= size:
+            for item, key in entries:
+                self.push(item, key)
+            return
+
+        self._heap.extend(self._new_record(item, key) for item, key in entries)
+        heapq.heapify(self._heap)
+        self._compact()
+
+    def pop_many(self, k):
+        """Remove the k items with the smallest keys, or all items if fewer remain.
+        Return the list of popped (item, key) pairs in ascending order of keys.
+        """
+        return [self.pop() for _ in range(min(k, len(self)))]
+
+    def nsmallest(self, k):
+        """Return the list of the k (item, key) pairs with the smallest keys in
+        ascending order of keys, without modifying the heap.
+        Only the top of the heap is searched, with a small heap of candidate
+        positions. Stale records are not reported, but their children still
+        become candidates.
+        """
+        heap = self._heap
+        result = []
+        if k <= 0 or not heap:
+            return result
+
+        # the candidates are (key, seq, position) triples, ordered like the records
+        candidates = [(heap[0][0], heap[0][1], 0)]
+        while candidates and len(result) < k:
+            key, _, idx = heapq.heappop(candidates)
+            item = heap[idx][2]
+            if item is not _REMOVED:
+                result.append((item, key))
+
+            for child in (2 * idx + 1, 2 * idx + 2):
+                if child < len(heap):
+                    heapq.heappush(candidates, (heap[child][0], heap[child][1], child))
+        return result
+
+    def meld(self, other):
+        """Merge all entries of another heap into this one. The other heap may be
+        of any type with the same interface, and is left unchanged.
+        For an item found in both heaps, the key from the other heap wins.
+        """
+        self.push_many([(item, other[item]) for item in other])
+
+
+# the position of an item that is not in IndexedHeapQueue
+_ABSENT = -1
+
+
+class IndexedHeapQueue:
+    """Implement a priority queue with the same interface as HeapQueue, for items
+    that are the dense ints 0, 1, ..., capacity - 1, such as relabelled graph nodes.
+    Instead of a dict, the positions of the items are kept in an array('l') indexed
+    by item, with _ABSENT for the items not in the heap, and the keys are kept in
+    an array('d') indexed by item. So all keys are stored as floats.
+    """
+
+    def __init__(self, capacity, entries=None, arity=2):
+        """
+        :argument:
+        capacity (int): the number of possible items
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        arity (int): the number of children of every node, at least 2
+        """
+        if arity < 2:
+            raise ValueError('arity must be at least 2')
+        self._arity = arity
+
+        self._heap = array('l')
+        self._positions = array('l', [_ABSENT]) * capacity
+        self._keys = array('d', [0.0]) * capacity
+
+        if entries is not None:
+            for item, key in entries:
+                self.push(item, key)
+
+    def __contains__(self, item):
+        """Return True if the item is in the heap."""
+        return 0 <= item < len(self._positions) and self._positions[item] != _ABSENT
+
+    def __len__(self):
+        """Number of entries remaining in the heap."""
+        return len(self._heap)
+
+    def __iter__(self):
+        """Iterate over all items."""
+        yield from self._heap
+
+    """Helper methods"""
+
+    def _up(self, idx):
+        """Bring a violating entry up to its correct position through a hole."""
+        heap, positions, keys = self._heap, self._positions, self._keys
+        arity = self._arity
+        item = heap[idx]
+        key = keys[item]
+
+        while idx > 0:
+            parent = (idx - 1) // arity
+            parent_item = heap[parent]
+            if key < keys[parent_item]:
+                heap[idx] = parent_item
+                positions[parent_item] = idx
+                idx = parent
+            else:
+                break
+
+        heap[idx] = item
+        positions[item] = idx
+
+    def _down(self, idx):
+        """Bring a violating entry down to its correct position through a hole."""
+        heap, positions, keys = self._heap, self._positions, self._keys
+        arity = self._arity
+        size = len(heap)
+        item = heap[idx]
+        key = keys[item]
+
+        while True:
+            # find the child with the smallest key
+            first = arity * idx + 1
+            if first >= size:
+                break
+            child = first
+            child_key = keys[heap[first]]
+            for other in range(first + 1, min(first + arity, size)):
+                if keys[heap[other]] < child_key:
+                    child = other
+                    child_key = keys[heap[other]]
+
+            if key > child_key:
+                child_item = heap[child]
+                heap[idx] = child_item
+                positions[child_item] = idx
+                idx = child
+            else:
+                break
+
+        heap[idx] = item
+        positions[item] = idx
+
+    def _pop_last(self, idx):
+        """Remove the entry at the given index by moving the last entry into it.
+        Return the index of the moved entry, or None if the removed entry was last.
+        """
+        item = self._heap.pop()
+        if idx == len(self._heap):
+            return None
+        self._heap[idx] = item
+        return idx
+
+    """Priority queue operations"""
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        if item not in self:
+            raise KeyError(f"{item} not found")
+
+        return self._keys[item]
+
+    def peek(self):
+        """Return the item with the minimum key."""
+        return self._heap[0]
+
+    def push(self, item, key):
+        """Push an item into the heap with a given key.
+        If the item already exists, update its key instead.
+        Raise a ValueError if the item is out of range.
+        """
+        if not 0 <= item < len(self._positions):
+            raise ValueError(f'item {item} out of range')
+
+        idx = self._positions[item]
+        if idx == _ABSENT:
+            # insert the new item to the end and bring it up to the correct position
+            self._keys[item] = key
+            self._heap.append(item)
+            self._up(len(self._heap) - 1)
+        else:
+            # the item already exists, update its key in place
+            old_key = self._keys[item]
+            self._keys[item] = key
+            if key < old_key:
+                self._up(idx)
+            if key > old_key:
+                self._down(idx)
+
+    def pop(self):
+        """Remove the item with the minimum key.
+        The resulting (item, key) pair is also returned."""
+        item = self._heap[0]
+
+        # the last entry fills the place of the first one, then goes down
+        if self._pop_last(0) is not None:
+            self._down(0)
+
+        self._positions[item] = _ABSENT
+        return item, self._keys[item]
+
+    def remove(self, item):
+        """Remove an item from the heap and return its key.
+        If the item does not exist, raise a KeyError."""
+        if item not in self:
+            raise KeyError(f"{item} not found")
+
+        idx = self._positions[item]
+        self._positions[item] = _ABSENT
+
+        # the last entry fills the hole, then goes either up or down
+        if self._pop_last(idx) is not None:
+            moved_item = self._heap[idx]
+            self._up(idx)
+            self._down(self._positions[moved_item])
+        return self._keys[item]
+
+    def discard(self, item):
+        """Remove an item from the heap if it exists."""
+        if item in self:
+            self.remove(item)
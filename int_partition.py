@@ -0,0 +1,212 @@
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class IntPartition:
+    """Implement a partition of the ints 0, 1, ..., size - 1 to disjoint groups as
+    a forest of trees, like Partition, but with the parents of all items kept in a
+    single flat array instead of a dict: a NumPy array when NumPy is available,
+    otherwise an array('l').
+    When two groups are merged, the larger root is hooked under the smaller one, so
+    the root of every group is its smallest item. Unlike union by weight, this rule
+    needs no weights and can be applied to a whole batch of roots at once, which is
+    how union_many merges the groups of many pairs with a few vectorized passes.
+    """
+
+    def __init__(self, size, use_numpy=None):
+        """
+        :argument:
+        size (int): the number of items
+        use_numpy (bool): whether to use NumPy arrays, by default if it is available
+        """
+        if use_numpy is None:
+            use_numpy = np is not None
+        elif use_numpy and np is None:
+            raise ImportError('NumPy is not available')
+        self._use_numpy = use_numpy
+
+        # parents of every node in the forest
+        if use_numpy:
+            self._parents = np.arange(size, dtype=np.int64)
+        else:
+            self._parents = array('l', range(size))
+
+    def __len__(self):
+        return len(self._parents)
+
+    def __contains__(self, item):
+        return 0 <= item < len(self._parents)
+
+    def __iter__(self):
+        yield from range(len(self._parents))
+
+    def find(self, item):
+        """Return the root of the group containing the given item, which is also
+        the smallest item of the group.
+        Also reset the parents of all nodes along the path to the root.
+        """
+        parents = self._parents
+
+        # first pass: walk up to the root
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+
+        # second pass: point every node along the path directly to the root
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+
+        return int(root)
+
+    def union(self, item1, item2):
+        """Merge the two groups (if they are disjoint) containing
+        the two given items.
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+
+        if root1 < root2:
+            self._parents[root2] = root1
+        elif root2 < root1:
+            self._parents[root1] = root2
+
+    def find_many(self, items):
+        """Return the roots of the groups containing the given items, as an array of
+        the same kind as the parents.
+        With NumPy, all items chase their parent pointers together, one level per
+        pass, and the given items are then pointed directly to their roots.
+        """
+        if not self._use_numpy:
+            return array('l', map(self.find, items))
+
+        parents = self._parents
+        items = np.asarray(items, dtype=np.int64)
+        roots = parents[items]
+        while True:
+            grandparents = parents[roots]
+            if np.array_equal(grandparents, roots):
+                break
+            roots = grandparents
+
+        parents[items] = roots
+        return roots
+
+    def union_many(self, pairs):
+        """Merge the groups containing the two items of every given pair.
+        With NumPy, every pass finds the roots of all pairs not yet in the same group,
+        then hooks each larger root under the smallest root paired with it.
+        The hooked roots are no longer roots, so every pass removes at least one group
+        and a pass without any hooking ends the loop.
+        """
+        if not self._use_numpy:
+            for item1, item2 in pairs:
+                self.union(item1, item2)
+            return
+
+        pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        firsts, seconds = pairs[:, 0], pairs[:, 1]
+        while len(firsts):
+            roots1 = self.find_many(firsts)
+            roots2 = self.find_many(seconds)
+
+            # only the pairs in different groups are kept for the next pass
+            apart = roots1 != roots2
+            firsts, seconds = firsts[apart], seconds[apart]
+            roots1, roots2 = roots1[apart], roots2[apart]
+            np.minimum.at(self._parents, np.maximum(roots1, roots2),
+                          np.minimum(roots1, roots2))
+
+
+class LabelPartition:
+    """Implement a partition of a set of hashable items on top of an IntPartition,
+    by mapping every item to an int id.
+    The items are fixed on initialization. Of the interface of Partition, only the
+    membership, find and union are supported, which is what
+    EdgeMapGraph.min_span_tree needs, plus the batch methods of IntPartition.
+    """
+
+    def __init__(self, items, use_numpy=None):
+        """
+        :argument:
+        items (iterable): the items, duplicates are ignored
+        use_numpy (bool): whether to use NumPy arrays, by default if it is available
+        """
+        # ids of the items, in the order they first appear
+        self._ids = {}
+        for item in items:
+            self._ids.setdefault(item, len(self._ids))
+
+        self._labels = list(self._ids)
+        self._partition = IntPartition(len(self._labels), use_numpy)
+
+    def __len__(self):
+        return len(self._labels)
+
+    def __contains__(self, item):
+        return item in self._ids
+
+    def __iter__(self):
+        yield from self._labels
+
+    def find(self, item):
+        """Return the root of the group containing the given item."""
+        return self._labels[self._partition.find(self._ids[item])]
+
+    def union(self, item1, item2):
+        """Merge the two groups (if they are disjoint) containing
+        the two given items.
+        """
+        self._partition.union(self._ids[item1], self._ids[item2])
+
+    def find_many(self, items):
+        """Return a list of the roots of the groups containing the given items."""
+        roots = self._partition.find_many([self._ids[item] for item in items])
+        return [self._labels[root] for root in roots]
+
+    def union_many(self, pairs):
+        """Merge the groups containing the two items of every given pair."""
+        ids = self._ids
+        self._partition.union_many([(ids[item1], ids[item2]) for item1, item2 in pairs])
+
+
+if __name__ == '__main__':
+    """Check both backends against Partition on random unions."""
+    import random
+
+    from partition import Partition
+
+    def same_groups(p, q, items):
+        """Return True if two partitions group the given items in the same way."""
+        pairs = {(p.find(item), q.find(item)) for item in items}
+        return len(pairs) == len({p_root for p_root, _ in pairs}) == \
+            len({q_root for _, q_root in pairs})
+
+    backends = [False] if np is None else [False, True]
+    for use_numpy in backends:
+        size = 10000
+        pairs = [(random.randrange(size), random.randrange(size)) for _ in range(size // 2)]
+
+        expected = Partition(range(size))
+        for item1, item2 in pairs:
+            expected.union(item1, item2)
+
+        p = IntPartition(size, use_numpy)
+        p.union_many(pairs)
+        print(f'use_numpy={use_numpy}')
+        print('same groups after union_many?', same_groups(p, expected, range(size)))
+        print('roots are the smallest items?',
+              all(p.find(item) <= item for item in range(size)))
+        print('find_many == find?',
+              list(p.find_many(range(size))) == [p.find(item) for item in range(size)])
+
+        labels = [f'node {item}' for item in range(size)]
+        q = LabelPartition(labels, use_numpy)
+        for item1, item2 in pairs:
+            q.union(labels[item1], labels[item2])
+        print('LabelPartition groups the same?',
+              all(q.find(labels[item]) == labels[p.find(item)] for item in range(size)))
+        print()
@@ -0,0 +1,88 @@
+# interval_tree.py
+
+from binary_search_tree import WeightBalancedTree, _BinaryNode
+
+
+class IntervalTree(WeightBalancedTree):
+    """Implement an interval tree as a sorted map from intervals to values.
+    Each key is a closed interval given as a (start, end) pair with start <= end.
+    The intervals are ordered by start and then by end, and every node also keeps
+    the maximum end point in its subtree, so that subtrees lying entirely to the
+    left of a query can be skipped.
+    The tree is weight-balanced, so its height is O(log n) even when the intervals
+    are inserted in order of time. A query reporting k intervals takes
+    O(min(n, (k + 1) log n)) time, since every reported node costs at most one
+    descent past the skipped subtrees.
+    """
+
+    def _new_node(self, key, value):
+        return _IntervalNode(key, value)
+
+    def __setitem__(self, key, value):
+        """Set self[(start, end)] to be value.
+        Overwrite the old value if the interval is found.
+        Raise a ValueError if end < start.
+        """
+        start, end = key
+        if end < start:
+            raise ValueError(f'invalid interval {key}')
+        super().__setitem__((start, end), value)
+
+    def overlap(self, low, high):
+        """Iterate over the (interval, value) pairs whose intervals overlap the
+        closed interval [low, high], in ascending order of intervals.
+        """
+        if self._root is not None:
+            yield from self._root.overlap(low, high)
+
+    def stab(self, point):
+        """Iterate over the (interval, value) pairs whose intervals contain the point,
+        in ascending order of intervals.
+        """
+        return self.overlap(point, point)
+
+
+class _IntervalNode(_BinaryNode):
+    """Represent a binary tree node that stores an interval, and also the
+    maximum end point of the intervals in its subtree.
+    """
+    __slots__ = 'max_end',
+
+    def __init__(self, key, value):
+        super().__init__(key, value)
+        self.max_end = key[1]
+
+    def update(self):
+        super().update()
+        max_end = self.key[1]
+        if self.left is not None and self.left.max_end > max_end:
+            max_end = self.left.max_end
+        if self.right is not None and self.right.max_end > max_end:
+            max_end = self.right.max_end
+        self.max_end = max_end
+
+    def overlap(self, low, high):
+        """An inorder traversal over the intervals overlapping [low, high]
+        in the subtree, with an explicit stack.
+        """
+        stack = []
+        node = self
+        while stack or node is not None:
+            if node is not None:
+                # skip the subtree if every interval in it ends before low
+                if node.max_end < low:
+                    node = None
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+
+                # the intervals come in ascending order of start, so once one
+                # starts after high, so does everything after it
+                start, end = node.key
+                if start > high:
+                    return
+                if end >= low:
+                    yield node.key, node.value
+                node = node.right
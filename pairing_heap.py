@@ -0,0 +1,169 @@
+class PairingHeap:
+    """Implement a priority queue in the form of a pairing heap, with the same
+    interface as HeapQueue.
+    Each entry is an (item, key) pair. Item with a lower key has a higher priority.
+    Item must be hashable and unique. No duplicate items.
+    Pushing an existing item would update its key instead.
+    Pushing takes O(1) time, by melding a new node with the root. Decreasing a key
+    cuts the node off and melds it with the root in O(1) actual time, but its
+    amortized cost is not O(1): Fredman proved an Omega(log log n) lower bound,
+    and the best known upper bound, by Pettie, is O(2 ** (2 * sqrt(log log n))),
+    which is o(log n). Popping and increasing a key take O(log n) amortized time.
+    """
+
+    def __init__(self, entries=None):
+        """
+        :argument:
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        """
+        self._root = None
+        self._nodes = {}
+
+        if entries is not None:
+            for item, key in entries:
+                self.push(item, key)
+
+    def __contains__(self, item):
+        """Return True if the item is in the heap."""
+        return item in self._nodes
+
+    def __len__(self):
+        """Number of entries remaining in the heap."""
+        return len(self._nodes)
+
+    def __iter__(self):
+        """Iterate over all items."""
+        yield from self._nodes
+
+    """Helper methods"""
+
+    @staticmethod
+    def _meld(node1, node2):
+        """Meld two heap-ordered trees, either of which may be None.
+        The root with the larger key becomes the first child of the other root.
+        Return the new root.
+        """
+        if node1 is None:
+            return node2
+        if node2 is None:
+            return node1
+
+        if node2.key < node1.key:
+            node1, node2 = node2, node1
+
+        node2.prev = node1
+        node2.sibling = node1.child
+        if node1.child is not None:
+            node1.child.prev = node2
+        node1.child = node2
+        return node1
+
+    @staticmethod
+    def _cut(node):
+        """Detach a non-root node, together with its subtree, from its parent."""
+        if node.prev.child is node:
+            node.prev.child = node.sibling
+        else:
+            node.prev.sibling = node.sibling
+        if node.sibling is not None:
+            node.sibling.prev = node.prev
+        node.prev = None
+        node.sibling = None
+
+    @staticmethod
+    def _merge_pairs(first):
+        """Meld a list of sibling trees, starting at the given node, into one tree
+        with the standard two-pass method. Return the new root.
+        """
+        # first pass: meld the trees in pairs from left to right
+        pairs = []
+        while first is not None:
+            second = first.sibling
+            if second is None:
+                nxt = None
+            else:
+                nxt = second.sibling
+                second.prev = second.sibling = None
+            first.prev = first.sibling = None
+            pairs.append(PairingHeap._meld(first, second))
+            first = nxt
+
+        # second pass: meld the results from right to left
+        root = None
+        for tree in reversed(pairs):
+            root = PairingHeap._meld(tree, root)
+        return root
+
+    """Priority queue operations"""
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        if item not in self._nodes:
+            raise KeyError(f"{item} not found")
+
+        return self._nodes[item].key
+
+    def peek(self):
+        """Return the item with the minimum key."""
+        if self._root is None:
+            raise IndexError('peek from an empty heap')
+        return self._root.item
+
+    def push(self, item, key):
+        """Push an item into the heap with a given key.
+        If the item already exists, update its key instead.
+        """
+        if item not in self._nodes:
+            node = _PairingNode(item, key)
+            self._nodes[item] = node
+            self._root = self._meld(self._root, node)
+            return
+
+        node = self._nodes[item]
+        old_key = node.key
+        node.key = key
+
+        if key < old_key:
+            # the subtree stays heap-ordered, cut it off and meld it with the root
+            if node is not self._root:
+                self._cut(node)
+                self._root = self._meld(self._root, node)
+
+        elif key > old_key:
+            # the children may now be smaller than the node,
+            # so meld them back separately from the node itself
+            children = self._merge_pairs(node.child)
+            node.child = None
+            if node is self._root:
+                self._root = children
+            else:
+                self._cut(node)
+                self._root = self._meld(self._root, children)
+            self._root = self._meld(self._root, node)
+
+    def pop(self):
+        """Remove the item with the minimum key.
+        The resulting (item, key) pair is also returned."""
+        if self._root is None:
+            raise IndexError('pop from an empty heap')
+
+        root = self._root
+        self._root = self._merge_pairs(root.child)
+        del self._nodes[root.item]
+        return root.item, root.key
+
+
+class _PairingNode:
+    """Represent a node of the pairing heap.
+    The children of a node form a doubly linked list through sibling and prev,
+    in which prev of the first child points to the parent instead.
+    """
+    __slots__ = 'item', 'key', 'child', 'sibling', 'prev'
+
+    def __init__(self, item, key):
+        self.item = item
+        self.key = key
+        self.child = None
+        self.sibling = None
+        self.prev = None
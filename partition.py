@@ -14,6 +14,11 @@ class Partition:
         # the sizes of the subtree
         self._weights = {item: 1 for item in items}
 
+        # the members of every group form a circular linked list,
+        # so that two groups are merged by swapping two links
+        self._next = {item: item for item in items}
+        self._group_count = len(self._parents)
+
     def __len__(self):
         return len(self._parents)
 
@@ -30,6 +35,8 @@ class Partition:
         if item not in self:
             self._parents[item] = item
             self._weights[item] = 1
+            self._next[item] = item
+            self._group_count += 1
 
     def add_group(self, items):
         """Add a list of items to form a separate group.
@@ -49,24 +56,40 @@ class Partition:
             self._parents[item] = items[0]
             self._weights[item] = 1
 
+        # link the items in a circle
+        for item, next_item in zip(items, items[1:] + items[:1]):
+            self._next[item] = next_item
+        self._group_count += 1
+
     def find(self, item):
         """Return the root of the group containing the given item.
         Also reset the parents of all nodes along the path to the root.
         """
-        if self._parents[item] == item:
-            return item
-        else:
-            # find the root and recursively set all parents to it
-            root = self.find(self._parents[item])
-            self._parents[item] = root
-            return root
+        parents = self._parents
+
+        # first pass: walk up to the root
+        root = item
+        while parents[root] != root:
+            root = parents[root]
+
+        # second pass: point every node along the path directly to the root
+        while parents[item] != root:
+            parents[item], item = root, parents[item]
+
+        return root
 
     def union(self, item1, item2):
         """Merge the two groups (if they are disjoint) containing
         the two given items.
         """
-        root1 = self.find(item1)
-        root2 = self.find(item2)
+        parents = self._parents
+
+        # skip the searches if both items are already roots
+        if parents[item1] == item1 and parents[item2] == item2:
+            root1, root2 = item1, item2
+        else:
+            root1 = self.find(item1)
+            root2 = self.find(item2)
 
         if root1 != root2:
             if self._weights[root1] < self._weights[root2]:
@@ -75,18 +98,101 @@ class Partition:
 
             # root1 is heavier, reset parent of root2 to root1
             # also update the weight of the tree at root1
-            self._parents[root2] = root1
+            parents[root2] = root1
             self._weights[root1] += self._weights[root2]
 
+            # splice the two circles into one
+            self._next[root1], self._next[root2] = self._next[root2], self._next[root1]
+            self._group_count -= 1
+
+    @property
+    def group_count(self):
+        """Return the number of groups."""
+        return self._group_count
+
+    def group_size(self, item):
+        """Return the number of items in the group containing the given item."""
+        # group size is the weight of the root
+        return self._weights[self.find(item)]
+
+    def members(self, item):
+        """Return a list of all items in the group containing the given item."""
+        result = [item]
+        member = self._next[item]
+        while member != item:
+            result.append(member)
+            member = self._next[member]
+        return result
+
+    def groups(self):
+        """Iterate over all groups, each as a list of its items."""
+        for item, parent in self._parents.items():
+            if item == parent:
+                yield self.members(item)
+
     @property
     def is_single_group(self):
         """Return true if all items are contained in a single group."""
-        # we just need one item, any item is ok
-        item = next(iter(self))
+        return self._group_count == 1
 
-        # group size is the weight of the root
-        group_size = self._weights[self.find(item)]
-        return group_size == len(self)
+
+class RollbackPartition(Partition):
+    """Implement a partition whose unions can be undone, in the reverse order.
+    Paths are never compressed, so every union changes only the links of two roots
+    and can be undone in O(1) time. Union by weight alone keeps the trees of
+    height O(log n), so find still takes O(log n) time.
+    Only unions are undone, the items added to the partition remain.
+    """
+
+    def __init__(self, items):
+        super().__init__(items)
+
+        # the (root1, root2) pairs of the unions done so far, root2 hooked under root1
+        self._history = []
+
+    def find(self, item):
+        """Return the root of the group containing the given item."""
+        parents = self._parents
+        while parents[item] != item:
+            item = parents[item]
+        return item
+
+    def union(self, item1, item2):
+        """Merge the two groups (if they are disjoint) containing
+        the two given items.
+        """
+        root1 = self.find(item1)
+        root2 = self.find(item2)
+
+        if root1 != root2:
+            if self._weights[root1] < self._weights[root2]:
+                root1, root2 = root2, root1
+
+            self._parents[root2] = root1
+            self._weights[root1] += self._weights[root2]
+            self._next[root1], self._next[root2] = self._next[root2], self._next[root1]
+            self._group_count -= 1
+            self._history.append((root1, root2))
+
+    def snapshot(self):
+        """Return a token of the current state, to be passed to rollback."""
+        return len(self._history)
+
+    def rollback(self, to):
+        """Undo all unions done since the snapshot with the given token.
+        Raise a ValueError if the state of the token has already been rolled back.
+        """
+        if not 0 <= to <= len(self._history):
+            raise ValueError(f'invalid snapshot {to}')
+
+        while len(self._history) > to:
+            root1, root2 = self._history.pop()
+            self._parents[root2] = root2
+            self._weights[root1] -= self._weights[root2]
+
+            # swapping the same two links again splits the circles back
+            self._next[root1], self._next[root2] = self._next[root2], self._next[root1]
+            self._group_count += 1
 
 
 if __name__ == '__main__':
@@ -131,3 +237,31 @@ if __name__ == '__main__':
     print(p._weights)
     print('p.is_single_group?', p.is_single_group)
     print()
+
+    print('p.group_count == 2?', p.group_count == 2)
+    print('p.group_size(12) == 5?', p.group_size(12) == 5)
+    print('p.members(12):', p.members(12))
+    expected_groups = [set(range(10)), set(range(10, 15))]
+    print('p.groups() == expected?',
+          sorted(map(set, p.groups()), key=min) == expected_groups)
+    print()
+
+    # a long parent chain, which a recursive find could not handle
+    q = Partition(range(10000))
+    q._parents = {item: max(item - 1, 0) for item in range(10000)}
+    print('q.find(9999) == 0?', q.find(9999) == 0)
+    print('q._parents fully compressed?', set(q._parents.values()) == {0})
+
+    # unions undone by rollback
+    r = RollbackPartition(range(10))
+    r.union(3, 4)
+    token = r.snapshot()
+    r.union(4, 9)
+    r.union(8, 0)
+    r.union(0, 3)
+    print('r.group_count == 6?', r.group_count == 6)
+    r.rollback(token)
+    print('r.group_count == 9?', r.group_count == 9)
+    print('r.members(3):', sorted(r.members(3)))
+    print('r._parents == expected?',
+          r._parents == {item: 3 if item == 4 else item for item in range(10)})
@@ -0,0 +1,112 @@
+class RadixHeap:
+    """Implement a monotone priority queue in the form of a radix heap, with the
+    same interface as HeapQueue.
+    Each entry is an (item, key) pair, in which the key must be a non-negative int.
+    Item must be hashable and unique. No duplicate items.
+    Pushing an existing item would update its key instead.
+    The queue is monotone: no key may be pushed below the last popped key, which
+    is exactly how Dijkstra uses its queue when all weights are non-negative ints.
+
+    Bucket i holds the items whose keys first differ from the last popped key at
+    bit i - 1, and bucket 0 holds the keys equal to it. Popping from an empty
+    bucket 0 redistributes the first non-empty bucket into lower buckets, and each
+    item can only move down, so every operation takes O(log C) amortized time,
+    where C is the largest key.
+    """
+
+    def __init__(self, entries=None):
+        """
+        :argument:
+        entries (iterable of tuples): an iterable of (item, key) pairs
+        """
+        self._last = 0
+        self._buckets = [{}]
+        self._keys = {}
+
+        if entries is not None:
+            for item, key in entries:
+                self.push(item, key)
+
+    def __contains__(self, item):
+        """Return True if the item is in the heap."""
+        return item in self._keys
+
+    def __len__(self):
+        """Number of entries remaining in the heap."""
+        return len(self._keys)
+
+    def __iter__(self):
+        """Iterate over all items."""
+        yield from self._keys
+
+    """Helper methods"""
+
+    def _bucket(self, key):
+        """Return the bucket of the given key, creating the buckets as needed."""
+        idx = (key ^ self._last).bit_length()
+        while len(self._buckets) <= idx:
+            self._buckets.append({})
+        return self._buckets[idx]
+
+    def _first_bucket(self):
+        """Return the index of the first non-empty bucket.
+        The heap must not be empty."""
+        idx = 0
+        while not self._buckets[idx]:
+            idx += 1
+        return idx
+
+    """Priority queue operations"""
+
+    def __getitem__(self, item):
+        """Return the key of an item.
+        If the item does not exist, raise a KeyError."""
+        if item not in self._keys:
+            raise KeyError(f"{item} not found")
+
+        return self._keys[item]
+
+    def peek(self):
+        """Return the item with the minimum key."""
+        if not self._keys:
+            raise IndexError('peek from an empty heap')
+
+        bucket = self._buckets[self._first_bucket()]
+        return min(bucket, key=bucket.get)
+
+    def push(self, item, key):
+        """Push an item into the heap with a given key.
+        If the item already exists, update its key instead.
+        Raise a ValueError if the key is not an int, or is less than the last popped key.
+        """
+        if not isinstance(key, int) or key < self._last:
+            raise ValueError(f'key {key} is not an int no less than {self._last}')
+
+        if item in self._keys:
+            old_key = self._keys[item]
+            if key == old_key:
+                return
+            del self._bucket(old_key)[item]
+
+        self._keys[item] = key
+        self._bucket(key)[item] = key
+
+    def pop(self):
+        """Remove the item with the minimum key.
+        The resulting (item, key) pair is also returned."""
+        if not self._keys:
+            raise IndexError('pop from an empty heap')
+
+        if not self._buckets[0]:
+            # the minimum of the first non-empty bucket becomes the last key,
+            # then its items all go to lower buckets
+            idx = self._first_bucket()
+            bucket = self._buckets[idx]
+            self._buckets[idx] = {}
+            self._last = min(bucket.values())
+            for bucket_item, bucket_key in bucket.items():
+                self._bucket(bucket_key)[bucket_item] = bucket_key
+
+        item, key = self._buckets[0].popitem()
+        del self._keys[item]
+        return item, key
@@ -1,4 +1,10 @@
+import functools
+import random
+
 import pytest
+from heap_queue import LazyHeapQueue, IndexedHeapQueue
+from pairing_heap import PairingHeap
+from int_partition import LabelPartition
 from weighted_graph import *
 
 
@@ -54,24 +60,39 @@ def edgegraph_after(edgegraph_before):
 @pytest.fixture(scope='class')
 def big_graph_for_dijkstra():
     g = DirectedGraph()
-    g._adjacency = {0: {4: 2},
-                    1: {0: 5, 2: 3, 4: 2},
-                    2: {1: 8},
-                    3: {2: 9, 10: 9},
-                    4: {0: 9, 1: 4, 5: 1, 8: 4},
-                    5: {1: 9, 6: 8, 8: 4},
-                    6: {},
-                    7: {0: 5, 8: 1},
-                    8: {},
-                    9: {8: 5},
-                    10: {3: 2},
-                    11: {8: 6, 12: 3, 14: 5},
-                    12: {13: 6, 16: 4},
-                    13: {9: 5, 16: 8},
-                    14: {7: 3, 11: 5},
-                    15: {11: 8, 16: 8},
-                    16: {12: 5, 15: 7, 17: 2},
-                    17: {10: 9}}
+    g.add_edge(0, 4, 2)
+    g.add_edge(1, 0, 5)
+    g.add_edge(1, 2, 3)
+    g.add_edge(1, 4, 2)
+    g.add_edge(2, 1, 8)
+    g.add_edge(3, 2, 9)
+    g.add_edge(3, 10, 9)
+    g.add_edge(4, 0, 9)
+    g.add_edge(4, 1, 4)
+    g.add_edge(4, 5, 1)
+    g.add_edge(4, 8, 4)
+    g.add_edge(5, 1, 9)
+    g.add_edge(5, 6, 8)
+    g.add_edge(5, 8, 4)
+    g.add_edge(7, 0, 5)
+    g.add_edge(7, 8, 1)
+    g.add_edge(9, 8, 5)
+    g.add_edge(10, 3, 2)
+    g.add_edge(11, 8, 6)
+    g.add_edge(11, 12, 3)
+    g.add_edge(11, 14, 5)
+    g.add_edge(12, 13, 6)
+    g.add_edge(12, 16, 4)
+    g.add_edge(13, 9, 5)
+    g.add_edge(13, 16, 8)
+    g.add_edge(14, 7, 3)
+    g.add_edge(14, 11, 5)
+    g.add_edge(15, 11, 8)
+    g.add_edge(15, 16, 8)
+    g.add_edge(16, 12, 5)
+    g.add_edge(16, 15, 7)
+    g.add_edge(16, 17, 2)
+    g.add_edge(17, 10, 9)
     return g
 
 
@@ -403,6 +424,65 @@ class TestDigraphAlgorithm:
                           16: []}
         assert paths == expected_paths
 
+    def test_distances_big_graph_15(self, big_graph_for_dijkstra):
+        g = big_graph_for_dijkstra
+        costs, paths = g.single_source_distances(15, [1, 6, 11, 16])
+        assert costs == {1: 27, 6: 32, 11: 8, 16: 8}
+        assert paths == g.single_source_shortest_paths(15, [1, 6, 11, 16])
+
+    def test_distances_unreachable(self, big_graph_for_dijkstra):
+        g = big_graph_for_dijkstra
+        costs, paths = g.single_source_distances(17, [1, 11])
+        assert costs == {1: 28, 11: INF}
+        assert paths == {1: [17, 10, 3, 2, 1], 11: []}
+
+    def test_distances_cutoff(self, big_graph_for_dijkstra):
+        g = big_graph_for_dijkstra
+        costs, paths = g.single_source_distances(15, cutoff=10)
+        assert costs == {15: 0, 11: 8, 16: 8, 17: 10}
+        assert paths == {15: [15], 11: [15, 11], 16: [15, 16], 17: [15, 16, 17]}
+
+    def test_distances_all_nodes(self, big_graph_for_dijkstra):
+        g = big_graph_for_dijkstra
+        costs, paths = g.single_source_distances(15)
+        assert set(costs) == set(paths) == set(g.nodes)
+        for node, path in paths.items():
+            assert sum(g.weight(*edge) for edge in zip(path, path[1:])) == costs[node]
+
+    @pytest.mark.parametrize('start, target, expected', [
+        (15, 1, [15, 11, 14, 7, 0, 4, 1]),
+        (15, 6, [15, 11, 14, 7, 0, 4, 5, 6]),
+        (17, 1, [17, 10, 3, 2, 1]),
+        (17, 11, []),
+        (5, 5, [5]),
+    ])
+    def test_shortest_path_big_graph(self, big_graph_for_dijkstra, start, target, expected):
+        g = big_graph_for_dijkstra
+        assert g.shortest_path(start, target) == expected
+
+    def test_shortest_path_random(self):
+        """The bidirectional search should find paths as short as Dijkstra's."""
+        for _ in range(100):
+            g = DirectedGraph()
+            for node in range(20):
+                g.add_node(node)
+            for _ in range(50):
+                g.add_edge(random.randrange(20), random.randrange(20), random.randint(0, 9))
+            start, target = random.randrange(20), random.randrange(20)
+
+            costs, paths = g.single_source_distances(start, [target])
+            path = g.shortest_path(start, target)
+            if not paths[target]:
+                assert path == []
+            else:
+                assert path[0] == start and path[-1] == target
+                assert sum(g.weight(*edge) for edge in zip(path, path[1:])) == costs[target]
+
+    @pytest.mark.parametrize('start, target', [(0, 1), (1, 'x'), ('x', 1)])
+    def test_shortest_path_error(self, digraph_after, start, target):
+        with pytest.raises(ValueError):
+            digraph_after.shortest_path(start, target)
+
 
 class TestEdgeGraphAlgorithm:
     def test_kruskal_single_node(self):
@@ -449,3 +529,116 @@ class TestEdgeGraphAlgorithm:
                         Edge(frozenset({12, 16}), 3),
                         Edge(frozenset({15, 17}), 3)}
         assert set(mst) == expected_mst
+
+
+class TestEdgeGraphIndex:
+    def test_index_matches_edges(self):
+        """neighbors and degree should agree with the edge map after random updates."""
+        g = EdgeMapGraph()
+        for _ in range(300):
+            start, end = random.sample(range(30), 2)
+            g.add_edge(start, end, random.randint(1, 10))
+        for _ in range(50):
+            start, end = random.sample(range(30), 2)
+            if frozenset({start, end}) in {edge.pair for edge in g.edges}:
+                g.remove_edge(start, end)
+        for label in random.sample(range(30), 5):
+            g.remove_node(label)
+
+        for label in g.nodes:
+            expected = {(next(iter(edge.pair - {label})), edge.weight)
+                        for edge in g.edges if label in edge.pair}
+            assert set(g.neighbors(label)) == expected
+            assert g.degree(label) == len(expected)
+        assert sum(g.degree(label) for label in g.nodes) == 2 * g.edge_count
+
+
+@pytest.mark.parametrize('partition_type', [Partition, LabelPartition])
+class TestEdgeGraphPartitionTypes:
+    """Kruskal should find the same tree whichever partition it uses."""
+
+    def test_kruskal_before(self, monkeypatch, partition_type):
+        g = init_graph(EdgeMapGraph)
+        monkeypatch.setattr(g, '_partition_type', partition_type)
+        expected_mst = [Edge(frozenset({1, 0}), 1),
+                        Edge(frozenset({0, 2}), 2),
+                        Edge(frozenset({1, 3}), 4),
+                        Edge(frozenset({4, 3}), 6)]
+        assert g.min_span_tree == expected_mst
+
+    def test_kruskal_big_graph(self, big_graph_for_kruskal, monkeypatch, partition_type):
+        g = big_graph_for_kruskal
+        monkeypatch.setattr(g, '_partition_type', partition_type)
+        mst = g.min_span_tree
+        assert len(mst) == g.node_count - 1
+        assert sum(edge.weight for edge in mst) == 50
+
+
+class TestDigraphReverse:
+    def test_reverse_matches_adjacency(self):
+        """in_neighbors, in_degree and edge_count should agree with the edges
+        after random updates."""
+        g = DirectedGraph()
+        for _ in range(300):
+            g.add_edge(random.randrange(30), random.randrange(30), random.randint(1, 10))
+        for edge in random.sample(list(g.edges), 50):
+            g.remove_edge(edge.start, edge.end)
+        for label in random.sample(range(30), 5):
+            g.remove_node(label)
+
+        edges = list(g.edges)
+        assert g.edge_count == len(edges)
+        for label in g.nodes:
+            expected = {(edge.start, edge.weight) for edge in edges if edge.end == label}
+            assert set(g.in_neighbors(label)) == expected
+            assert g.in_degree(label) == len(expected)
+
+    @pytest.mark.parametrize('node', [0, 4, 'x'])
+    def test_in_neighbors_error(self, digraph_after, node):
+        with pytest.raises(ValueError):
+            digraph_after.in_neighbors(node)
+        with pytest.raises(ValueError):
+            digraph_after.in_degree(node)
+
+
+@pytest.mark.parametrize('heap_type', [None, HeapQueue, LazyHeapQueue, PairingHeap,
+                                       RadixHeap, functools.partial(IndexedHeapQueue, 18)])
+class TestDigraphHeapTypes:
+    """Dijkstra should find the same paths whichever heap it uses."""
+
+    def test_dijkstra_big_graph_15(self, big_graph_for_dijkstra, heap_type):
+        g = big_graph_for_dijkstra
+        paths = g.single_source_shortest_paths(15, [1, 6, 11, 16], heap_type)
+        expected_paths = {1: [15, 11, 14, 7, 0, 4, 1],
+                          6: [15, 11, 14, 7, 0, 4, 5, 6],
+                          11: [15, 11],
+                          16: [15, 16]}
+        assert paths == expected_paths
+
+    def test_dijkstra_big_graph_17(self, big_graph_for_dijkstra, heap_type):
+        g = big_graph_for_dijkstra
+        paths = g.single_source_shortest_paths(17, [1, 6, 11, 16], heap_type)
+        expected_paths = {1: [17, 10, 3, 2, 1],
+                          6: [17, 10, 3, 2, 1, 4, 5, 6],
+                          11: [],
+                          16: []}
+        assert paths == expected_paths
+
+    def test_shortest_path_big_graph(self, big_graph_for_dijkstra, heap_type):
+        g = big_graph_for_dijkstra
+        assert g.shortest_path(15, 6, heap_type) == [15, 11, 14, 7, 0, 4, 5, 6]
+        assert g.shortest_path(17, 1, heap_type) == [17, 10, 3, 2, 1]
+
+
+class TestDigraphHeapSelection:
+    def test_dijkstra_heap_selection(self):
+        """A RadixHeap is chosen only while all weights are non-negative ints."""
+        g = init_graph(DirectedGraph)
+        assert isinstance(g._make_frontier([]), RadixHeap)
+        g.add_edge(0, 4, 2.5)
+        assert isinstance(g._make_frontier([]), HeapQueue)
+        assert g.single_source_shortest_paths(0, [4]) == {4: [0, 4]}
+        g.remove_edge(0, 4)
+        assert isinstance(g._make_frontier([]), RadixHeap)
+        g.add_edge(0, 4, -1)
+        assert isinstance(g._make_frontier([]), HeapQueue)
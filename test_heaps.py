@@ -0,0 +1,435 @@
+import asyncio
+import functools
+import queue
+import random
+import threading
+
+import pytest
+from heap_queue import HeapQueue, LazyHeapQueue, IndexedHeapQueue
+from concurrent_heap_queue import ThreadSafeHeapQueue, AsyncHeapQueue
+from pairing_heap import PairingHeap
+from radix_heap import RadixHeap
+
+INF = float('inf')
+
+"""Heap Classes that we are testing."""
+
+HEAPS = [HeapQueue,
+         pytest.param(functools.partial(HeapQueue, typecode='d'), id='HeapQueue-array'),
+         LazyHeapQueue, PairingHeap]
+
+
+"""Constants for testing small fixed inputs.
+The items are deliberately repeated, so that pushing all entries one by one
+updates some of the keys. The heaps are initialized with the unique entries.
+"""
+
+ITEMS = 'TU5AVERNIEH3WXBQ7AFOIIC20HP18AWSRDKRMSZUL46J9FLYG9'
+ENTRIES = [(item, (i * 37) % 101) for i, item in enumerate(ITEMS)]
+DICT_ENTRIES = dict(ENTRIES)
+SORTED_ENTRIES = sorted(DICT_ENTRIES.items(), key=lambda entry: entry[1])
+
+
+@pytest.fixture(scope='class')
+def heap_pair(request):
+    """Return an empty heap of the requested heap class and also a python dictionary
+    of the keys. In the tests, we would compare our heaps with the python dicts.
+    Since the scope is 'class', modifications done by previous tests
+    are carried over to later tests.
+    """
+    return request.param(), {}
+
+
+def random_push(heap, python_dict, count=2000):
+    """Helper function for pushing random entries into heap and python_dict.
+    About half of the pushes update the key of an existing item.
+    """
+    for _ in range(count):
+        item = random.randrange(count)
+        key = random.random()
+        heap.push(item, key)
+        python_dict[item] = key
+    return heap, python_dict
+
+
+def random_pop(heap, python_dict):
+    """Helper function for popping half of the entries from the heap, asserting
+    that they come out in ascending order of keys.
+    """
+    popped_key = -1
+    for _ in range(len(python_dict) // 2):
+        item, key = heap.pop()
+        assert key >= popped_key
+        assert python_dict.pop(item) == key
+        popped_key = key
+    return heap, python_dict
+
+
+"""Test classes"""
+
+
+@pytest.mark.parametrize('heap_type', HEAPS)
+class TestHeapFixedInput:
+    """Test class for heaps with small fixed inputs."""
+
+    def test_len(self, heap_type):
+        heap = heap_type(DICT_ENTRIES.items())
+        assert len(heap) == len(DICT_ENTRIES)
+
+    def test_iter(self, heap_type):
+        heap = heap_type(DICT_ENTRIES.items())
+        assert set(heap) == set(DICT_ENTRIES)
+
+    def test_getitem(self, heap_type):
+        heap = heap_type(DICT_ENTRIES.items())
+        for item, key in DICT_ENTRIES.items():
+            assert item in heap
+            assert heap[item] == key
+        assert 'a' not in heap
+        with pytest.raises(KeyError):
+            heap['a']
+
+    def test_pop_order(self, heap_type):
+        heap = heap_type(DICT_ENTRIES.items())
+        assert heap.peek() == SORTED_ENTRIES[0][0]
+        assert [heap.pop() for _ in range(len(heap))] == SORTED_ENTRIES
+        with pytest.raises(IndexError):
+            heap.pop()
+
+    def test_push(self, heap_type):
+        """Pushing a repeated item should update its key."""
+        heap = heap_type()
+        for item, key in ENTRIES:
+            heap.push(item, key)
+        assert len(heap) == len(DICT_ENTRIES)
+        assert [heap.pop() for _ in range(len(heap))] == SORTED_ENTRIES
+
+    def test_update_keys(self, heap_type):
+        """Decreasing and increasing keys should reorder the entries."""
+        heap = heap_type(DICT_ENTRIES.items())
+        heap.push(SORTED_ENTRIES[-1][0], -1)
+        heap.push(SORTED_ENTRIES[0][0], 1000)
+        assert heap.pop() == (SORTED_ENTRIES[-1][0], -1)
+        assert [heap.pop() for _ in range(len(heap))][-1] == (SORTED_ENTRIES[0][0], 1000)
+
+
+@pytest.mark.parametrize('heap_pair', HEAPS, indirect=True)
+class TestHeapRandomInput:
+    """Test class for heaps with large random inputs.
+    We push a large number of random entries, updating many keys on the way,
+    then pop half of the entries and check the order. The process is repeated three times.
+    """
+
+    def test_first_push(self, heap_pair):
+        heap, python_dict = random_push(*heap_pair)
+        assert len(heap) == len(python_dict)
+        assert {item: heap[item] for item in heap} == python_dict
+
+    def test_first_pop(self, heap_pair):
+        heap, python_dict = random_pop(*heap_pair)
+        assert len(heap) == len(python_dict)
+
+    def test_second_push(self, heap_pair):
+        heap, python_dict = random_push(*heap_pair)
+        assert {item: heap[item] for item in heap} == python_dict
+
+    def test_second_pop(self, heap_pair):
+        heap, python_dict = random_pop(*heap_pair)
+        assert len(heap) == len(python_dict)
+
+    def test_third_push(self, heap_pair):
+        heap, python_dict = random_push(*heap_pair)
+        assert {item: heap[item] for item in heap} == python_dict
+
+    def test_pop_all(self, heap_pair):
+        heap, python_dict = heap_pair
+        keys = [heap.pop()[1] for _ in range(len(python_dict))]
+        assert keys == sorted(python_dict.values())
+        assert len(heap) == 0
+
+
+@pytest.mark.parametrize('heap_type', [HeapQueue, LazyHeapQueue])
+class TestHeapQueueBatch:
+    """Test class for the batch operations of HeapQueue and LazyHeapQueue."""
+
+    @pytest.mark.parametrize('count', [10, 2000])
+    def test_push_many(self, heap_type, count):
+        """Small batches are pushed one by one, large ones are reheapified."""
+        heap, python_dict = random_push(heap_type(), {})
+        entries = [(random.randrange(4000), random.random()) for _ in range(count)]
+        heap.push_many(entries)
+        python_dict.update(entries)
+        assert {item: heap[item] for item in heap} == python_dict
+        random_pop(heap, python_dict)
+
+    def test_pop_many(self, heap_type):
+        heap = heap_type(DICT_ENTRIES.items())
+        assert heap.pop_many(5) == SORTED_ENTRIES[:5]
+        assert heap.pop_many(100) == SORTED_ENTRIES[5:]
+        assert heap.pop_many(1) == []
+
+    @pytest.mark.parametrize('arity', [2, 3, 8])
+    @pytest.mark.parametrize('k', [0, 1, 10, 100])
+    def test_nsmallest(self, heap_type, arity, k):
+        """nsmallest should agree with sorting, and leave the heap unchanged."""
+        if heap_type is HeapQueue:
+            heap = HeapQueue(DICT_ENTRIES.items(), arity)
+        else:
+            # stale records of removed items must be skipped
+            heap = heap_type(DICT_ENTRIES.items())
+            heap.push('removed', -1)
+            heap.remove('removed')
+        assert heap.nsmallest(k) == SORTED_ENTRIES[:k]
+        assert len(heap) == len(DICT_ENTRIES)
+        assert heap.pop_many(len(heap)) == SORTED_ENTRIES
+
+    @pytest.mark.parametrize('other_type', HEAPS)
+    def test_meld(self, heap_type, other_type):
+        """Melding takes the keys from the other heap for the shared items."""
+        heap, python_dict = random_push(heap_type(), {})
+        other, other_dict = random_push(other_type(), {}, count=3000)
+        heap.meld(other)
+        python_dict.update(other_dict)
+        assert len(other) == len(other_dict)
+        assert {item: heap[item] for item in heap} == python_dict
+        keys = [key for _, key in heap.pop_many(len(heap))]
+        assert keys == sorted(python_dict.values())
+
+
+class TestHeapQueueRemove:
+    """Test class for removing arbitrary items and for bounded heaps."""
+
+    @pytest.mark.parametrize('arity', [2, 4])
+    def test_remove(self, arity):
+        heap, python_dict = random_push(HeapQueue(arity=arity), {})
+        for item in random.sample(list(python_dict), k=len(python_dict) // 2):
+            assert heap.remove(item) == python_dict.pop(item)
+            assert item not in heap
+        assert len(heap) == len(python_dict)
+        random_pop(heap, python_dict)
+        with pytest.raises(KeyError):
+            heap.remove(-1)
+
+    def test_discard(self):
+        heap = HeapQueue(DICT_ENTRIES.items())
+        heap.discard(SORTED_ENTRIES[0][0])
+        heap.discard('a')
+        assert heap.pop_many(len(heap)) == SORTED_ENTRIES[1:]
+
+    @pytest.mark.parametrize('heap_type', [HeapQueue, LazyHeapQueue])
+    @pytest.mark.parametrize('maxsize', [1, 10, 100])
+    def test_bounded_top_k(self, heap_type, maxsize):
+        """A bounded heap keeps the entries with the largest keys seen in a stream."""
+        heap = heap_type(maxsize=maxsize)
+        keys = [random.random() for _ in range(2000)]
+        for item, key in enumerate(keys):
+            heap.push(item, key)
+            assert len(heap) <= maxsize
+        top = sorted(((item, key) for item, key in enumerate(keys)),
+                     key=lambda entry: entry[1])[-maxsize:]
+        assert heap.pop_many(maxsize) == top
+
+    @pytest.mark.parametrize('heap_type', [HeapQueue, LazyHeapQueue])
+    def test_bounded_push_result(self, heap_type):
+        heap = heap_type([('a', 1), ('b', 2), ('c', 3)], maxsize=2)
+        assert len(heap) == 2 and 'a' not in heap
+        assert heap.push('d', 2) == ('d', 2)
+        assert heap.push('e', 5) == ('b', 2)
+        assert heap.push('c', 0) is None
+        assert heap.pop_many(2) == [('c', 0), ('e', 5)]
+
+
+class TestLazyHeapQueue:
+    """Test class for the stale records of LazyHeapQueue."""
+
+    def test_compaction(self):
+        """Repeated updates leave stale records, which must be compacted away."""
+        heap = LazyHeapQueue((item, 0) for item in range(100))
+        for key in range(1, 50):
+            for item in range(100):
+                heap.push(item, key + item / 100)
+            assert len(heap._heap) <= 2 * len(heap) + heap._min_stale
+        assert heap.pop() == (0, 49)
+
+    def test_remove(self):
+        heap, python_dict = random_push(LazyHeapQueue(), {})
+        for item in random.sample(list(python_dict), k=len(python_dict) // 2):
+            assert heap.remove(item) == python_dict.pop(item)
+            assert item not in heap
+        heap.discard(-1)
+        with pytest.raises(KeyError):
+            heap.remove(-1)
+        assert len(heap) == len(python_dict)
+        random_pop(heap, python_dict)
+
+
+class TestRadixHeap:
+    """Test class for the monotone RadixHeap, which only takes int keys
+    no less than the last popped key.
+    """
+
+    def test_monotone_pushes(self):
+        """Simulate a Dijkstra-like workload, in which the pushed keys are the
+        last popped key plus a random weight, and some keys are decreased.
+        """
+        heap = RadixHeap([(0, 0)])
+        python_dict = {0: 0}
+        last_key = 0
+        for item in range(1, 3000):
+            if python_dict and random.random() < 0.4:
+                popped_item, key = heap.pop()
+                assert key == min(python_dict.values())
+                assert python_dict.pop(popped_item) == key
+                last_key = key
+
+            key = last_key + random.randrange(1000)
+            target = random.randrange(1, item + 1)
+            if target in python_dict and key >= python_dict[target]:
+                continue
+            heap.push(target, key)
+            python_dict[target] = key
+            assert heap[target] == key
+
+        assert heap.peek() in [item for item, key in python_dict.items()
+                               if key == min(python_dict.values())]
+        keys = [heap.pop()[1] for _ in range(len(python_dict))]
+        assert keys == sorted(python_dict.values())
+
+    @pytest.mark.parametrize('key', [-1, 4, 2.5, INF])
+    def test_invalid_key(self, key):
+        heap = RadixHeap([('a', 5), ('b', 7)])
+        heap.pop()
+        with pytest.raises(ValueError):
+            heap.push('c', key)
+
+
+class TestThreadSafeHeapQueue:
+    """Test class for ThreadSafeHeapQueue with producer and consumer threads."""
+
+    def test_producers_consumers(self):
+        """Every pushed item is popped by one of the blocked consumers."""
+        heap = ThreadSafeHeapQueue()
+        popped = []
+
+        def consume():
+            while True:
+                item, _ = heap.pop(timeout=5)
+                if isinstance(item, tuple):
+                    return
+                popped.append(item)
+
+        def produce(first):
+            for item in range(first, first + 500):
+                heap.push(item, random.random())
+                # re-score some waiting items
+                heap.push(random.randrange(first, item + 1), random.random())
+
+        consumers = [threading.Thread(target=consume) for _ in range(4)]
+        producers = [threading.Thread(target=produce, args=(i * 500,)) for i in range(4)]
+        for thread in consumers + producers:
+            thread.start()
+        for thread in producers:
+            thread.join()
+
+        # the stop signals come after all remaining items
+        for i in range(4):
+            heap.push((None, i), 2)
+        for thread in consumers:
+            thread.join()
+
+        # a re-scored item may come back after being popped, but none is lost
+        assert set(popped) == set(range(2000))
+        assert len(heap) == 0
+
+    def test_pop_timeout(self):
+        heap = ThreadSafeHeapQueue([('a', 1)])
+        assert heap.pop(block=False) == ('a', 1)
+        with pytest.raises(queue.Empty):
+            heap.pop(block=False)
+        with pytest.raises(queue.Empty):
+            heap.pop(timeout=0.01)
+
+    def test_pop_wakes_up(self):
+        heap = ThreadSafeHeapQueue()
+        timer = threading.Timer(0.05, heap.push, args=('a', 1))
+        timer.start()
+        assert heap.pop(timeout=5) == ('a', 1)
+
+
+class TestAsyncHeapQueue:
+    """Test class for AsyncHeapQueue with producer and consumer tasks."""
+
+    def test_producers_consumers(self):
+        async def main():
+            heap = AsyncHeapQueue()
+            popped = []
+
+            async def consume():
+                while True:
+                    item, _ = await heap.pop()
+                    if isinstance(item, tuple):
+                        return
+                    popped.append(item)
+
+            consumers = [asyncio.ensure_future(consume()) for _ in range(4)]
+            for item in range(1000):
+                heap.push(item, random.random())
+                heap.push(random.randrange(item + 1), random.random())
+                if item % 10 == 0:
+                    await asyncio.sleep(0)
+            for i in range(4):
+                heap.push((None, i), 2)
+            await asyncio.wait_for(asyncio.gather(*consumers), 5)
+            return heap, popped
+
+        heap, popped = asyncio.run(main())
+        assert set(popped) == set(range(1000))
+        assert len(heap) == 0
+
+    def test_pop_order_and_cancel(self):
+        async def main():
+            heap = AsyncHeapQueue()
+            waiter = asyncio.ensure_future(heap.pop())
+            cancelled = asyncio.ensure_future(heap.pop())
+            await asyncio.sleep(0)
+            cancelled.cancel()
+            heap.push('b', 2)
+            heap.push('a', 1)
+            # the waiter runs only after both pushes, and takes the minimum
+            assert await asyncio.wait_for(waiter, 5) == ('a', 1)
+            assert heap.pop_nowait() == ('b', 2)
+            with pytest.raises(asyncio.QueueEmpty):
+                heap.pop_nowait()
+
+        asyncio.run(main())
+
+
+@pytest.mark.parametrize('arity', [2, 8])
+class TestIndexedHeapQueue:
+    """Test class for IndexedHeapQueue, whose items are ints in a fixed range."""
+
+    def test_random_input(self, arity):
+        heap, python_dict = random_push(IndexedHeapQueue(2000, arity=arity), {})
+        assert {item: heap[item] for item in heap} == python_dict
+        random_pop(heap, python_dict)
+        for item in random.sample(list(python_dict), k=len(python_dict) // 2):
+            assert heap.remove(item) == python_dict.pop(item)
+            assert item not in heap
+        random_push(heap, python_dict)
+        keys = [heap.pop()[1] for _ in range(len(python_dict))]
+        assert keys == sorted(python_dict.values())
+
+    def test_membership(self, arity):
+        heap = IndexedHeapQueue(10, [(3, 1.5), (7, 0.5)], arity)
+        assert 3 in heap and 7 in heap
+        assert 4 not in heap and -1 not in heap and 10 not in heap
+        assert heap.peek() == 7
+        with pytest.raises(KeyError):
+            heap[4]
+        with pytest.raises(ValueError):
+            heap.push(10, 1.0)
+        heap.discard(7)
+        heap.discard(4)
+        assert heap.pop() == (3, 1.5)
+        with pytest.raises(IndexError):
+            heap.pop()
@@ -1,4 +1,6 @@
 import collections
+import functools
+import operator
 import random
 from string import ascii_lowercase
 from itertools import product
@@ -6,12 +8,22 @@ from itertools import product
 import pytest
 from hash_table import HashTable
 from sorted_list_map import SortedListMap
-from binary_search_tree import BinarySearchTree
+from binary_search_tree import (BinarySearchTree, ArenaBinarySearchTree,
+                                WeightBalancedTree, AggregateTree, SplayTree)
+from b_tree import BTree
+from interval_tree import IntervalTree
 
 """Map Classes that we are testing."""
 
-UNSORTED_MAPS = [HashTable, SortedListMap, BinarySearchTree]
-SORTED_MAPS = [SortedListMap, BinarySearchTree]
+# B+ trees with small fanouts split and merge nodes on almost every change
+BTREES = [BTree,
+          pytest.param(functools.partial(BTree, fanout=3), id='BTree-fanout-3'),
+          pytest.param(functools.partial(BTree, fanout=4), id='BTree-fanout-4')]
+
+UNSORTED_MAPS = [HashTable, SortedListMap, BinarySearchTree, ArenaBinarySearchTree,
+                 WeightBalancedTree, AggregateTree, SplayTree] + BTREES
+SORTED_MAPS = [SortedListMap, BinarySearchTree, ArenaBinarySearchTree,
+               WeightBalancedTree, AggregateTree, SplayTree] + BTREES
 
 
 """Constants and a fixture for testing small fixed inputs.
@@ -74,7 +86,7 @@ def random_delitem(my_map, python_dict):
     Number of removed items is chosen to be 2/3 of the existing items.
     """
     num_dels = len(python_dict) * 2 // 3
-    removed_keys = random.sample(python_dict.keys(), k=num_dels)
+    removed_keys = random.sample(list(python_dict), k=num_dels)
     for key in removed_keys:
         del my_map[key]
         del python_dict[key]
@@ -239,3 +251,218 @@ class TestSortedMapRandomInput:
     def test_third_delitem(self, map_pair):
         my_map, python_dict = random_delitem(*map_pair)
         assert list(my_map) == sorted(python_dict)
+
+
+class TestBTree:
+    """Test class for the range scans of BTree over the linked leaves."""
+
+    @pytest.mark.parametrize('fanout', [3, 4, 32])
+    @pytest.mark.parametrize('low, high', [('0', '9'), ('A', 'Z'), ('5', 'F'),
+                                           (':', '@'), ('Z', 'A')])
+    def test_items_between(self, fanout, low, high):
+        """Test the range scan over small fixed inputs."""
+        my_map = BTree(ITEMS, fanout=fanout)
+        expected = [(key, value) for key, value in SORTED_ITEMS if low <= key <= high]
+        assert list(my_map.items_between(low, high)) == expected
+
+    @pytest.mark.parametrize('fanout', [3, 4])
+    def test_items_between_after_delitem(self, fanout):
+        """Test the range scan after deletions have merged and relinked the leaves."""
+        my_map, python_dict = random_setitem(BTree(fanout=fanout), {})
+        random_delitem(my_map, python_dict)
+        low, high = sorted(random.sample(POSSIBLE_KEYS, k=2))
+        expected = [(key, python_dict[key]) for key in sorted(python_dict)
+                    if low <= key <= high]
+        assert list(my_map.items_between(low, high)) == expected
+
+
+class TestWeightBalancedTree:
+    """Test class for the balance of WeightBalancedTree."""
+
+    @staticmethod
+    def check_balance(node):
+        """Assert that every subtree length is correct and that no branch is more
+        than 3 times as heavy as the other, and return the length."""
+        if node is None:
+            return 0
+        left_length = TestWeightBalancedTree.check_balance(node.left)
+        right_length = TestWeightBalancedTree.check_balance(node.right)
+        assert left_length + 1 <= 3 * (right_length + 1)
+        assert right_length + 1 <= 3 * (left_length + 1)
+        assert node.length == left_length + right_length + 1
+        return node.length
+
+    def test_balance_after_random_changes(self):
+        my_map, python_dict = random_setitem(WeightBalancedTree(), {})
+        assert self.check_balance(my_map._root) == len(python_dict)
+        random_delitem(my_map, python_dict)
+        assert self.check_balance(my_map._root) == len(python_dict)
+
+    def test_balance_after_sorted_changes(self):
+        my_map = WeightBalancedTree((i, i) for i in range(3000))
+        assert self.check_balance(my_map._root) == 3000
+        for i in range(1000, 3000):
+            del my_map[i]
+        assert self.check_balance(my_map._root) == 1000
+        assert list(my_map.items()) == [(i, i) for i in range(1000)]
+
+
+class TestAggregateTree:
+    """Test class for the range aggregates of AggregateTree."""
+
+    @pytest.mark.parametrize('combine', [operator.add, min, max])
+    @pytest.mark.parametrize('low, high', [('0', '9'), ('A', 'Z'), ('5', 'F'),
+                                           ('0', 'Z'), ('2', '2')])
+    def test_aggregate(self, combine, low, high):
+        """Test the range aggregate against a linear scan."""
+        my_map = AggregateTree(ITEMS, combine=combine)
+        values = [value for key, value in SORTED_ITEMS if low <= key <= high]
+        assert my_map.aggregate(low, high) == functools.reduce(combine, values)
+
+    @pytest.mark.parametrize('low, high', [(':', '@'), ('Z', 'A'), ('a', 'z')])
+    def test_empty_range(self, low, high):
+        """Test the range aggregate over a range without any key."""
+        my_map = AggregateTree(ITEMS)
+        assert my_map.aggregate(low, high, default=0) == 0
+        with pytest.raises(KeyError):
+            my_map.aggregate(low, high)
+
+    def test_aggregate_after_delitem(self):
+        """Test the range aggregate after random insertions and deletions,
+        in which nodes with two children are replaced by their predecessors.
+        """
+        my_map, python_dict = random_setitem(AggregateTree(), {})
+        random_delitem(my_map, python_dict)
+        low, high = sorted(random.sample(POSSIBLE_KEYS, k=2))
+        values = [python_dict[key] for key in python_dict if low <= key <= high]
+        assert my_map.aggregate(low, high, default=0) == sum(values)
+
+
+    def test_sorted_inserts(self):
+        """Time buckets arriving in order must keep the tree balanced."""
+        size = 5000
+        my_map = AggregateTree(((i, i) for i in range(size)), combine=max)
+        assert TestWeightBalancedTree.check_balance(my_map._root) == size
+        assert my_map.aggregate(100, 2000) == 2000
+        for i in range(size // 2):
+            del my_map[i]
+        assert my_map.aggregate(0, size) == size - 1
+        assert my_map.aggregate(0, size // 2) == size // 2
+
+class TestIntervalTree:
+    """Test class for the overlap and stabbing queries of IntervalTree."""
+
+    def test_overlap(self):
+        """Test the queries against a linear scan.
+        Random intervals are added and removed, and queried after every change.
+        """
+        my_map = IntervalTree()
+        python_dict = {}
+        for i in range(500):
+            start = random.randrange(300)
+            interval = (start, start + random.randrange(50))
+            if interval in python_dict and random.random() < 0.5:
+                del my_map[interval]
+                del python_dict[interval]
+            else:
+                my_map[interval] = i
+                python_dict[interval] = i
+
+            low = random.randrange(-10, 360)
+            high = low + random.randrange(20)
+            expected = [(key, value) for key, value in sorted(python_dict.items())
+                        if key[0] <= high and key[1] >= low]
+            assert list(my_map.overlap(low, high)) == expected
+            expected = [(key, value) for key, value in sorted(python_dict.items())
+                        if key[0] <= low <= key[1]]
+            assert list(my_map.stab(low)) == expected
+
+    @staticmethod
+    def height(node):
+        """Return the height of a subtree, iteratively."""
+        height = 0
+        level = [node] if node is not None else []
+        while level:
+            height += 1
+            level = [child for node in level for child in (node.left, node.right)
+                     if child is not None]
+        return height
+
+    def test_sorted_inserts(self):
+        """Intervals inserted in order of time must keep the tree balanced,
+        and the queries and deletions must still work.
+        """
+        size = 5000
+        my_map = IntervalTree(((i, i + 2), i) for i in range(size))
+        assert self.height(my_map._root) <= 2 * size.bit_length()
+        assert list(my_map.stab(size // 2)) == [((i, i + 2), i) for i in
+                                                range(size // 2 - 2, size // 2 + 1)]
+        assert len(list(my_map.overlap(0, size))) == size
+
+        for i in range(0, size, 2):
+            del my_map[(i, i + 2)]
+        assert len(my_map) == size // 2
+        assert self.height(my_map._root) <= 2 * (size // 2).bit_length()
+        assert list(my_map.stab(size // 2)) == [((i, i + 2), i) for i in
+                                                range(size // 2 - 1, size // 2 + 1, 2)]
+
+    def test_invalid(self):
+        """An interval ending before it starts should raise a ValueError."""
+        my_map = IntervalTree()
+        with pytest.raises(ValueError):
+            my_map[(2, 1)] = None
+
+
+class TestSplayTree:
+    """Test class for the splaying behaviour of SplayTree."""
+
+    @staticmethod
+    def check_lengths(node):
+        """Assert that every subtree length is correct, and return the length."""
+        if node is None:
+            return 0
+        length = 1 + (TestSplayTree.check_lengths(node.left) +
+                      TestSplayTree.check_lengths(node.right))
+        assert node.length == length
+        return length
+
+    def test_items_match_dict(self):
+        """Iterating over the items must not splay the tree under the iterator."""
+        my_map = SplayTree(ITEMS)
+        assert dict(my_map.items()) == dict(ITEMS)
+        assert list(my_map.values()) == [value for _, value in SORTED_ITEMS]
+        assert my_map == dict(ITEMS)
+
+    @pytest.mark.parametrize('key', SORTED_KEYS)
+    def test_access_splays_to_root(self, key):
+        """After getting or setting a key, its node becomes the root."""
+        my_map = SplayTree(ITEMS)
+        my_map[key]
+        assert my_map._root.key == key
+        my_map.minimum()
+        my_map[key] = 'new'
+        assert my_map._root.key == key
+        assert my_map._root.value == 'new'
+
+    def test_lengths_after_rotations(self):
+        """Subtree lengths stay correct after random accesses and deletions."""
+        my_map, python_dict = random_setitem(SplayTree(), {})
+        for key in random.sample(list(python_dict), k=len(python_dict) // 2):
+            my_map[key]
+        random_delitem(my_map, python_dict)
+        assert len(my_map) == len(python_dict)
+        assert self.check_lengths(my_map._root) == len(python_dict)
+
+    def test_sorted_inserts(self):
+        """Inserting sorted keys makes a long chain, which must not hit
+        the recursion limit.
+        """
+        my_map = SplayTree((i, i) for i in range(10000))
+        assert len(my_map) == 10000
+        assert list(my_map) == list(range(10000))
+        assert my_map.minimum() == (0, 0)
+        assert my_map[5000] == 5000
+        assert my_map.predecessor(5000) == (4999, 4999)
+        assert my_map.successor(5000) == (5001, 5001)
+        del my_map[0]
+        assert len(my_map) == 9999
@@ -0,0 +1,226 @@
+import collections
+import random
+
+import pytest
+from partition import Partition
+from int_partition import IntPartition, LabelPartition
+from connected_components import (connected_components, EdgeFile, read_edges,
+                                  stream_components)
+
+"""Backends of IntPartition that we are testing."""
+
+BACKENDS = [False, pytest.param(True, id='numpy')]
+
+SIZE = 2000
+
+
+@pytest.fixture
+def use_numpy(request):
+    """Return whether to use NumPy, skipping the NumPy backend if it is missing."""
+    if request.param:
+        pytest.importorskip('numpy')
+    return request.param
+
+
+def random_pairs(count, size=SIZE):
+    """Return a list of random pairs of items in range(size)."""
+    return [(random.randrange(size), random.randrange(size)) for _ in range(count)]
+
+
+def assert_same_groups(partition, expected, items):
+    """Assert that two partitions group the given items in the same way."""
+    pairs = {(partition.find(item), expected.find(item)) for item in items}
+    assert len(pairs) == len({root for root, _ in pairs}) == \
+        len({root for _, root in pairs})
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS, indirect=True)
+class TestIntPartition:
+    """Test class for both backends of IntPartition, compared with Partition."""
+
+    @pytest.mark.parametrize('count', [0, 1, SIZE // 2, 2 * SIZE])
+    def test_union(self, use_numpy, count):
+        pairs = random_pairs(count)
+        partition = IntPartition(SIZE, use_numpy)
+        expected = Partition(range(SIZE))
+        for item1, item2 in pairs:
+            partition.union(item1, item2)
+            expected.union(item1, item2)
+        assert_same_groups(partition, expected, range(SIZE))
+
+    @pytest.mark.parametrize('count', [0, 1, SIZE // 2, 2 * SIZE])
+    def test_union_many(self, use_numpy, count):
+        """Batches of unions, with the roots always the smallest items."""
+        partition = IntPartition(SIZE, use_numpy)
+        expected = Partition(range(SIZE))
+        for _ in range(3):
+            pairs = random_pairs(count)
+            partition.union_many(pairs)
+            for item1, item2 in pairs:
+                expected.union(item1, item2)
+            assert_same_groups(partition, expected, range(SIZE))
+        assert all(partition.find(item) <= item for item in range(SIZE))
+
+    def test_chain(self, use_numpy):
+        """Each pair of a chain hooks a root found only after the previous pass."""
+        pairs = [(item + 1, item) for item in range(SIZE - 1)]
+        random.shuffle(pairs)
+        partition = IntPartition(SIZE, use_numpy)
+        partition.union_many(pairs)
+        assert list(partition.find_many(range(SIZE))) == [0] * SIZE
+
+    def test_find_many(self, use_numpy):
+        partition = IntPartition(SIZE, use_numpy)
+        partition.union_many(random_pairs(SIZE // 2))
+        items = [random.randrange(SIZE) for _ in range(500)]
+        expected = [partition.find(item) for item in items]
+        assert list(partition.find_many(items)) == expected
+        assert list(partition.find_many([])) == []
+
+    def test_membership(self, use_numpy):
+        partition = IntPartition(10, use_numpy)
+        assert len(partition) == 10
+        assert list(partition) == list(range(10))
+        assert 0 in partition and 9 in partition
+        assert -1 not in partition and 10 not in partition
+
+
+@pytest.mark.parametrize('use_numpy', BACKENDS, indirect=True)
+class TestLabelPartition:
+    """Test class for LabelPartition, compared with Partition."""
+
+    def test_union_and_find(self, use_numpy):
+        labels = [f'node {item}' for item in range(SIZE)]
+        partition = LabelPartition(labels + labels[:10], use_numpy)
+        expected = Partition(labels)
+        assert len(partition) == SIZE
+        assert list(partition) == labels
+
+        pairs = [(labels[item1], labels[item2]) for item1, item2 in random_pairs(SIZE)]
+        partition.union_many(pairs[:SIZE // 2])
+        for label1, label2 in pairs[SIZE // 2:]:
+            partition.union(label1, label2)
+        for label1, label2 in pairs:
+            expected.union(label1, label2)
+
+        assert_same_groups(partition, expected, labels)
+        assert partition.find_many(labels) == [partition.find(label) for label in labels]
+        with pytest.raises(KeyError):
+            partition.find('missing')
+
+
+def assert_components(labels, sizes, edges):
+    """Assert that labels and sizes describe the components of the given edges."""
+    expected = Partition([])
+    for start, end in edges:
+        expected.add_item(start)
+        expected.add_item(end)
+        expected.union(start, end)
+
+    assert set(labels) == set(expected)
+    pairs = {(labels[item], expected.find(item)) for item in expected}
+    assert len(pairs) == len(sizes) == expected.group_count
+    assert sizes == collections.Counter(labels.values())
+    assert all(labels[root] == root for root in sizes)
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+class TestConnectedComponents:
+    """Test class for connected_components, compared with Partition."""
+
+    @pytest.mark.parametrize('shard_size', [7, 100, 100_000])
+    def test_random_edges(self, workers, shard_size):
+        edges = random_pairs(SIZE // 2)
+        labels, sizes = connected_components(edges, workers, shard_size)
+        assert_components(labels, sizes, edges)
+
+    def test_labels(self, workers):
+        """Self-loops make singleton components, and any hashable items work."""
+        edges = [('a', 'b'), ('c', 'c'), ('b', 'd'), ('e', 'f')]
+        labels, sizes = connected_components(iter(edges), workers, shard_size=1)
+        assert_components(labels, sizes, edges)
+        assert sorted(sizes.values()) == [1, 2, 3]
+
+    def test_no_edges(self, workers):
+        assert connected_components([], workers) == ({}, {})
+
+
+class Interrupt(Exception):
+    """Raised by a progress callback to stop a stream halfway."""
+
+
+class TestStreamComponents:
+    """Test class for stream_components, resumed from checkpoints."""
+
+    @staticmethod
+    def write_edges(path, edges):
+        with open(path, 'w') as file:
+            file.write('# start end\n')
+            for start, end in edges:
+                file.write(f'{start} {end}\n\n')
+
+    def run_interrupted(self, make_edges, checkpoint, stop_at):
+        """Run a stream that saves every chunk and stops after stop_at edges, then
+        resume it. Return the resulting partition and the edge counts reported
+        by the resumed run.
+        """
+        def stop(edge_count, forest):
+            if edge_count >= stop_at:
+                raise Interrupt
+
+        with pytest.raises(Interrupt):
+            stream_components(make_edges(), 100, stop, checkpoint, checkpoint_every=0)
+
+        counts = []
+        forest = stream_components(make_edges(), 100,
+                                   lambda edge_count, forest: counts.append(edge_count),
+                                   checkpoint, checkpoint_every=0)
+        return forest, counts
+
+    def test_resume_file(self, tmp_path):
+        """A resumed EdgeFile seeks past the edges already read."""
+        edges = random_pairs(SIZE)
+        edge_path = str(tmp_path / 'edges.txt')
+        self.write_edges(edge_path, edges)
+        start_offsets = []
+
+        class RecordingEdgeFile(EdgeFile):
+            def __iter__(self):
+                start_offsets.append(self.offset)
+                return super().__iter__()
+
+        forest, counts = self.run_interrupted(lambda: RecordingEdgeFile(edge_path, int),
+                                              str(tmp_path / 'checkpoint'), 1000)
+        assert counts[0] == 1100 and counts[-1] == SIZE
+
+        # the header and the first 1000 edges, with the empty lines between them
+        with open(edge_path, 'rb') as file:
+            lines = file.readlines()
+        assert start_offsets == [0, sum(map(len, lines[:2000]))]
+
+        _, sizes = connected_components(edges, workers=1)
+        assert forest.group_count == len(sizes)
+        assert all(forest.find(start) == forest.find(end) for start, end in edges)
+
+    def test_resume_iterable(self, tmp_path):
+        """Other iterables skip the edges already read."""
+        edges = random_pairs(SIZE)
+        forest, counts = self.run_interrupted(lambda: iter(edges),
+                                              str(tmp_path / 'checkpoint'), 500)
+        assert counts[0] == 600 and counts[-1] == SIZE
+        _, sizes = connected_components(edges, workers=1)
+        assert forest.group_count == len(sizes)
+        assert all(forest.find(start) == forest.find(end) for start, end in edges)
+
+    def test_checkpoint_every(self, tmp_path):
+        """Checkpoints are written only when enough time has passed, and at the end."""
+        checkpoint = tmp_path / 'checkpoint'
+        saved = []
+
+        def progress(edge_count, forest):
+            saved.append(checkpoint.exists())
+
+        stream_components(random_pairs(SIZE), 100, progress, str(checkpoint),
+                          checkpoint_every=3600)
+        assert not any(saved)
+        assert checkpoint.exists()
@@ -2,6 +2,7 @@ import abc
 from collections import namedtuple
 
 from heap_queue import HeapQueue
+from radix_heap import RadixHeap
 from partition import Partition
 
 DirectedEdge = namedtuple('DirectedEdge', 'start end weight')
@@ -10,6 +11,11 @@ Edge = namedtuple('Edge', 'pair weight')
 INF = float('inf')
 
 
+def _is_int_weight(weight):
+    """Return True if the weight can be used as a key of RadixHeap."""
+    return isinstance(weight, int) and weight >= 0
+
+
 class WeightedGraph(abc.ABC):
     """An abstract base class for a weighted graph."""
 
@@ -82,32 +88,63 @@ class WeightedGraph(abc.ABC):
 
 class DirectedGraph(WeightedGraph):
     """Implement a directed weighted graph using adjacency map."""
+    # the arity of the heap used by the shortest-path search,
+    # chosen by the benchmarks in bench_heaps.py
+    _heap_arity = 8
 
     def __init__(self):
-        """Initialize the graph with an adjacency map."""
+        """Initialize the graph with an adjacency map, a reverse adjacency map of
+        the in-neighbors, and the number of edges.
+        """
         self._adjacency = {}
+        self._reverse = {}
+        self._edge_count = 0
+
+        # whether all weights are non-negative ints, None if unknown
+        self._int_weights = None
 
     def add_node(self, label):
-        # if no such node, initialize the corresponding neighbour dict
+        # if no such node, initialize the corresponding neighbour dicts
         self._adjacency.setdefault(label, {})
+        self._reverse.setdefault(label, {})
 
     def add_edge(self, start, end, weight):
-        self._adjacency.setdefault(end, {})
+        self.add_node(start)
+        self.add_node(end)
 
         # extract the neighbour dict of start and set weight
-        nbr_dict = self._adjacency.setdefault(start, {})
+        nbr_dict = self._adjacency[start]
+        if end not in nbr_dict:
+            self._edge_count += 1
         nbr_dict[end] = weight
+        self._reverse[end][start] = weight
+
+        # a new int weight keeps the flag, anything else makes it unknown
+        if not (self._int_weights and _is_int_weight(weight)):
+            self._int_weights = None
 
     def remove_node(self, label):
         if label not in self._adjacency:
             raise ValueError(f'no node {label}')
 
         else:
-            del self._adjacency[label]
+            out_dict = self._adjacency.pop(label)
+            in_dict = self._reverse.pop(label)
+
+            # delete the edges at the given node from the dicts of its neighbors
+            for end in out_dict:
+                if end != label:
+                    del self._reverse[end][label]
+            for start in in_dict:
+                if start != label:
+                    del self._adjacency[start][label]
 
-            # delete all edges whose end node is the given node
-            for _, nbr_dict in self._adjacency.items():
-                nbr_dict.pop(label, None)
+            # a self-loop is in both dicts but only counted once
+            self._edge_count -= len(out_dict) + len(in_dict) - (label in out_dict)
+
+            # removing edges can only make a False flag unknown
+            if self._int_weights is False:
+                self._int_weights = None
 
     def remove_edge(self, start, end):
         try:
@@ -119,6 +156,12 @@ class DirectedGraph(WeightedGraph):
         except KeyError:
             raise ValueError(f'no edge from {start} to {end}')
 
+        del self._reverse[end][start]
+        self._edge_count -= 1
+
+        if self._int_weights is False:
+            self._int_weights = None
+
     @property
     def nodes(self):
         yield from self._adjacency
@@ -138,7 +181,7 @@ class DirectedGraph(WeightedGraph):
 
     @property
     def edge_count(self):
-        return sum(len(nbr_dict) for nbr_dict in self._adjacency.values())
+        return self._edge_count
 
     def neighbors(self, label):
         if label not in self._adjacency:
@@ -156,6 +199,26 @@ class DirectedGraph(WeightedGraph):
         else:
             return len(self._adjacency[label])
 
+    def in_neighbors(self, label):
+        """Return an iterator, in which each item is an (neighbor, weight) pair,
+        where neighbor is an in-neighbor of the node with the given label and
+        weight is the weight of the corresponding edge.
+        Raise a ValueError if the node does not exist.
+        """
+        if label not in self._reverse:
+            raise ValueError(f'no node {label}')
+        else:
+            return iter(self._reverse[label].items())
+
+    def in_degree(self, label):
+        """Return the in-degree of the node with the given label.
+        Raise a ValueError if the node does not exist.
+        """
+        if label not in self._reverse:
+            raise ValueError(f'no node {label}')
+        else:
+            return len(self._reverse[label])
+
     def weight(self, start, end):
         try:
             return self._adjacency[start][end]
@@ -164,27 +227,25 @@ class DirectedGraph(WeightedGraph):
         except KeyError:
             raise ValueError(f'no edge from {start} to {end}')
 
-    def single_source_shortest_paths(self, start, targets):
+    def single_source_shortest_paths(self, start, targets, heap_type=None):
         """Find the shortest paths to multiple targets from a single source.
         Return a dictionary whose keys are the given targets and values are the
         corresponding shortest paths.
+        The priority queue of the search is made by calling heap_type with an
+        iterable of (node, cost) pairs, e.g. HeapQueue, LazyHeapQueue or PairingHeap.
+        If heap_type is None, a RadixHeap is used when all weights are non-negative
+        ints, otherwise a HeapQueue of arity _heap_arity.
         """
         targets = list(targets)
-
-        # check all nodes exist
-        if start not in self._adjacency:
-            raise ValueError(f'no node {start}')
-        for target in targets:
-            if target not in self._adjacency:
-                raise ValueError(f'no node {target}')
+        self._check_nodes(start, targets)
 
         # use dijkstra to obtain the shortest-path tree, which
         # is then used to construct a path for each target
         result = {}
-        came_from = self._dijkstra(start, targets)
+        costs, came_from = self._dijkstra(start, targets, heap_type)
 
         for target in targets:
-            if target not in came_from:
+            if target not in costs:
                 # no path from start to target
                 path = []
             else:
@@ -193,38 +254,172 @@ class DirectedGraph(WeightedGraph):
 
         return result
 
-    def _dijkstra(self, start, targets):
+    def single_source_distances(self, start, targets=None, cutoff=None, heap_type=None):
+        """Find the shortest paths and their costs to multiple targets from a single
+        source. If targets is None, find them for all nodes reachable from start.
+        If cutoff is given, the nodes whose costs exceed it are treated as
+        unreachable, and the search stops as soon as it passes the cutoff.
+        Return a tuple (costs, paths) of two dictionaries, which map every target to
+        its cost and shortest path, or to INF and [] if it is unreachable.
+        heap_type is the same as that of single_source_shortest_paths.
+        """
+        if targets is not None:
+            targets = list(targets)
+        self._check_nodes(start, targets or [])
+
+        settled_costs, came_from = self._dijkstra(start, targets, heap_type, cutoff)
+        if targets is None:
+            targets = settled_costs
+
+        costs = {}
+        paths = {}
+        for target in targets:
+            if target not in settled_costs:
+                costs[target] = INF
+                paths[target] = []
+            else:
+                costs[target] = settled_costs[target]
+                paths[target] = DirectedGraph._construct_path(came_from, target)
+
+        return costs, paths
+
+    def shortest_path(self, start, target, heap_type=None):
+        """Find the shortest path from start to target with a bidirectional search.
+        Return the path as a list of nodes, which is empty if there is no path.
+        A forward search from start over the out-edges and a backward search from
+        target over the in-edges take turns, each time settling a node of the one
+        with the smaller frontier. mu is the cost of the shortest path found through
+        any edge that connects the two searches. Once the costs of the nodes settled
+        by the two searches sum up to at least mu, no shorter path can remain, so the
+        search stops while both searches cover only part of the graph.
+        heap_type is the same as that of single_source_shortest_paths.
+        """
+        self._check_nodes(start, [target])
+        if start == target:
+            return [start]
+
+        # the state of the forward (0) and backward (1) searches
+        edge_maps = (self._adjacency, self._reverse)
+        frontiers = (self._make_frontier([(start, 0)], heap_type),
+                     self._make_frontier([(target, 0)], heap_type))
+        costs = ({}, {})
+        came_from = ({start: None}, {target: None})
+
+        # the costs of the last nodes settled by the two searches
+        last_costs = [0, 0]
+        mu = INF
+        meeting_node = None
+
+        while frontiers[0] and frontiers[1]:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            frontier, other_frontier = frontiers[side], frontiers[1 - side]
+            other_costs = costs[1 - side]
+
+            # stopping rule: the costs of the two frontiers are at least those of
+            # the last settled nodes, so no path through them can be shorter than mu
+            cur_node, cur_cost = frontier.pop()
+            if cur_cost + last_costs[1 - side] >= mu:
+                break
+            costs[side][cur_node] = cur_cost
+            last_costs[side] = cur_cost
+
+            for nxt_node, weight in edge_maps[side][cur_node].items():
+                nxt_cost = cur_cost + weight
+
+                if nxt_node not in costs[side]:
+                    if nxt_node not in frontier or nxt_cost < frontier[nxt_node]:
+                        frontier.push(nxt_node, nxt_cost)
+                        came_from[side][nxt_node] = cur_node
+
+                # the edge connects the two searches if the other one has reached nxt_node
+                if nxt_node in other_costs:
+                    other_cost = other_costs[nxt_node]
+                elif nxt_node in other_frontier:
+                    other_cost = other_frontier[nxt_node]
+                else:
+                    continue
+                if nxt_cost + other_cost < mu:
+                    mu = nxt_cost + other_cost
+                    meeting_node = nxt_node
+
+        if meeting_node is None:
+            # no path from start to target
+            return []
+
+        # the forward tree leads from start to the meeting node,
+        # and the backward tree from the meeting node to target
+        path = DirectedGraph._construct_path(came_from[0], meeting_node)
+        cur_node = came_from[1][meeting_node]
+        while cur_node is not None:
+            path.append(cur_node)
+            cur_node = came_from[1][cur_node]
+        return path
+
+    def _check_nodes(self, start, targets):
+        """Raise a ValueError if the start or any target does not exist."""
+        if start not in self._adjacency:
+            raise ValueError(f'no node {start}')
+        for target in targets:
+            if target not in self._adjacency:
+                raise ValueError(f'no node {target}')
+
+    def _dijkstra(self, start, targets, heap_type=None, cutoff=None):
         """A helper method that implements the Dijkstra algorithm.
-        Return the shortest-path tree represented as a dict came_from.
+        If targets is None, search until all reachable nodes are settled, and
+        if cutoff is not None, stop before settling any node whose cost exceeds it.
+        Return a tuple (costs, came_from), in which costs maps every settled node to
+        its cost, and came_from is the shortest-path tree.
         """
         came_from = {start: None}
-        targets = set(targets)
+        targets = None if targets is None else set(targets)
 
-        # initialize the cost of every node to be infinity, except the start
-        frontier = HeapQueue((node, INF) for node in self.nodes)
-        frontier.push(start, 0)
+        # nodes are pushed only when discovered, the start has cost 0
+        frontier = self._make_frontier([(start, 0)], heap_type)
+        costs = {}
 
         while frontier:
             # node popped from the queue already has its shortest path found,
             # can be safely discarded
             cur_node, cur_cost = frontier.pop()
-            targets.discard(cur_node)
 
-            # if all targets are found, stop
-            if not targets:
+            # all remaining nodes cost more than the cutoff
+            if cutoff is not None and cur_cost > cutoff:
                 break
+            costs[cur_node] = cur_cost
+
+            # if all targets are found, stop
+            if targets is not None:
+                targets.discard(cur_node)
+                if not targets:
+                    break
 
             for nxt_node, weight in self.neighbors(cur_node):
                 # only relax the nodes to which shortest paths are not yet found
-                if nxt_node in frontier:
+                if nxt_node not in costs:
                     nxt_cost = cur_cost + weight
 
-                    # if new cost less than the current cost, update it
-                    if nxt_cost < frontier[nxt_node]:
+                    # if newly discovered or new cost less than the current cost, update it
+                    if nxt_node not in frontier or nxt_cost < frontier[nxt_node]:
                         frontier.push(nxt_node, nxt_cost)
                         came_from[nxt_node] = cur_node
 
-        return came_from
+        return costs, came_from
+
+    def _make_frontier(self, entries, heap_type=None):
+        """Make the priority queue of a shortest-path search with the given entries.
+        If heap_type is None, choose a RadixHeap when all weights are non-negative
+        ints, otherwise a HeapQueue.
+        """
+        if heap_type is not None:
+            return heap_type(entries)
+
+        if self._int_weights is None:
+            self._int_weights = all(_is_int_weight(weight) for nbr_dict in
+                                    self._adjacency.values() for weight in nbr_dict.values())
+        if self._int_weights:
+            return RadixHeap(entries)
+        else:
+            return HeapQueue(entries, self._heap_arity)
 
     @staticmethod
     def _construct_path(came_from, target):
@@ -246,29 +441,37 @@ class DirectedGraph(WeightedGraph):
 
 class EdgeMapGraph(WeightedGraph):
     """Implement an undirected weighted graph using edge map."""
+    # the partition used by the minimum spanning tree search, which is made by
+    # calling it with the nodes, e.g. Partition or int_partition.LabelPartition
+    _partition_type = Partition
 
     def __init__(self):
-        """Initialize the graph with a node set and an edge map."""
-        self._nodes = set()
+        """Initialize the graph with an adjacency map and an edge map.
+        The adjacency map indexes the edges at every node, so that the queries
+        of a single node take time proportional to its degree.
+        """
+        self._adjacency = {}
         self._edges = {}
 
     def add_node(self, label):
-        self._nodes.add(label)
+        # if no such node, initialize the corresponding neighbour dict
+        self._adjacency.setdefault(label, {})
 
     def add_edge(self, start, end, weight):
-        self._nodes.add(start)
-        self._nodes.add(end)
+        self._adjacency.setdefault(start, {})[end] = weight
+        self._adjacency.setdefault(end, {})[start] = weight
         pair = frozenset({start, end})
         self._edges[pair] = weight
 
     def remove_node(self, label):
-        if label not in self._nodes:
+        if label not in self._adjacency:
             raise ValueError(f'no node {label}')
         else:
-            self._nodes.remove(label)
-            # retain edges that don't contain the given node
-            self._edges = {pair: weight for pair, weight in self._edges.items()
-                           if label not in pair}
+            # only delete the edges at the given node
+            for nbr in self._adjacency.pop(label):
+                del self._edges[frozenset({label, nbr})]
+                if nbr != label:
+                    del self._adjacency[nbr][label]
 
     def remove_edge(self, start, end):
         pair = frozenset({start, end})
@@ -276,46 +479,40 @@ class EdgeMapGraph(WeightedGraph):
             raise ValueError(f'no edge from {start} to {end}')
         else:
             del self._edges[pair]
+            del self._adjacency[start][end]
+            self._adjacency[end].pop(start, None)
 
     @property
     def nodes(self):
-        yield from self._nodes
+        yield from self._adjacency
 
     @property
     def edges(self):
         for pair, weight in self._edges.items():
             yield Edge(pair, weight)
-    
+
     @property
     def node_count(self):
-        return len(self._nodes)
+        return len(self._adjacency)
 
     @property
     def edge_count(self):
         return len(self._edges)
 
     def neighbors(self, label):
-        if label not in self._nodes:
+        if label not in self._adjacency:
             raise ValueError(f'no node {label}')
 
-        # return a generator instead of yield from so that
+        # return iter instead of yield from so that
         # ValueError is raised correctly
         else:
-            return self._gen_nbrs(label)
-
-    def _gen_nbrs(self, label):
-        # helper method to generate the neighbors
-        for (start, end), weight in self._edges.items():
-            if start == label:
-                yield (end, weight)
-            elif end == label:
-                yield (start, weight)
+            return iter(self._adjacency[label].items())
 
     def degree(self, label):
-        if label not in self._nodes:
+        if label not in self._adjacency:
             raise ValueError(f'no node {label}')
         else:
-            return sum(label in pair for pair in self._edges)
+            return len(self._adjacency[label])
 
     def weight(self, start, end):
         pair = frozenset({start, end})
@@ -328,7 +525,7 @@ class EdgeMapGraph(WeightedGraph):
     def min_span_tree(self):
         """Use the Kruskal's algorithm to find the minimum spanning tree."""
         result = []
-        forest = Partition(self.nodes)
+        forest = self._partition_type(self.nodes)
 
         # greedily pick lighter edges first
         sorted_edges = sorted(self.edges, key=lambda edge: edge.weight)